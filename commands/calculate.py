@@ -3,45 +3,84 @@ import logging
 import discord
 from discord import app_commands
 
-from utils.get_dag_info import update_network_info, network_info
+from utils.get_dag_info import get_network_info
 from utils.get_price_data import get_spr_price
+from utils.mining_projection import period_totals, project_rewards
 
 
 async def get_net_info():
-    await update_network_info()
     try:
+        network_info = await get_network_info()
         logging.debug(f"Network info: {network_info}")
         diff = float(network_info["Difficulty"])
         current_reward = float(network_info["Block Reward"].split(" -> ")[0])
         net_hash_mhs = (diff * 2) / 1e6
-        return current_reward, net_hash_mhs
+        daa_score = int(network_info["virtualDaaScore"])
+        return current_reward, net_hash_mhs, daa_score
     except Exception as err:
         logging.error(f"Error fetching network info: {err}")
-        return None, None
+        return None, None, None
 
 
-def calc_rewards(reward, share):
-    return {
-        "Hour": reward * 3600 * share,
-        "Day": reward * 86400 * share,
-        "Week": reward * 86400 * 7 * share,
-        "Month": reward * 86400 * (365.25 / 12) * share,
-        "Year": reward * 86400 * 365.25 * share,
-    }
+def calc_rewards(hashrates, net_hash_mhs, daa_score, monthly_growth=0.0):
+    """
+    [{period: SPR}] for each hashrate in MH/s.
+
+    Follows the monthly reward reductions from the current DAA score on, and
+    an optional monthly network hashrate growth.
+    """
+    totals = period_totals(
+        project_rewards(hashrates, net_hash_mhs, daa_score, monthly_growth)
+    )
+    return [
+        {period: float(mined[i]) for period, mined in totals.items()}
+        for i in range(len(hashrates))
+    ]
+
+
+def parse_hashrates(rigs):
+    """'100, 250.5' -> [100.0, 250.5], None if any entry is not a positive number."""
+    try:
+        hashrates = [float(h) for h in rigs.split(",") if h.strip()]
+    except ValueError:
+        return None
+    if not hashrates or any(h <= 0 for h in hashrates):
+        return None
+    return hashrates
 
 
 @app_commands.command(
     name="calc", description="Estimate mining rewards from your hashrate."
 )
-@app_commands.describe(hashrate="Your mining hashrate in kH/s")
-async def calc(interaction: discord.Interaction, hashrate: float):
+@app_commands.describe(
+    hashrate="Your mining hashrate in kH/s",
+    growth="Expected monthly network hashrate growth in % (default 0)",
+    rigs="More hashrates in kH/s to compare, comma separated",
+)
+async def calc(
+    interaction: discord.Interaction,
+    hashrate: float,
+    growth: float = 0.0,
+    rigs: str = None,
+):
     await interaction.response.defer()
 
     if hashrate <= 0:
         await interaction.followup.send("Please provide a valid hashrate >0")
         return
-
-    current_reward, net_hash_mhs = await get_net_info()
+    if growth <= -100:
+        await interaction.followup.send("Please provide a growth above -100%")
+        return
+    rig_hashrates = []
+    if rigs is not None:
+        rig_hashrates = parse_hashrates(rigs)
+        if rig_hashrates is None:
+            await interaction.followup.send(
+                "Please provide rigs as comma separated hashrates >0 in kH/s"
+            )
+            return
+
+    current_reward, net_hash_mhs, daa_score = await get_net_info()
     spr_price = await get_spr_price()
 
     if current_reward is None or net_hash_mhs is None:
@@ -53,7 +92,12 @@ async def calc(interaction: discord.Interaction, hashrate: float):
     user_hash_mhs = hashrate / 1e3  # kH/s to MH/s
     share = user_hash_mhs / net_hash_mhs
 
-    rewards = calc_rewards(current_reward, share)
+    rewards, *rig_rewards = calc_rewards(
+        [h / 1e3 for h in [hashrate, *rig_hashrates]],
+        net_hash_mhs,
+        daa_score,
+        growth / 100,
+    )
     daily_mined = current_reward * 86400
     emissions = daily_mined * spr_price
 
@@ -64,13 +108,19 @@ async def calc(interaction: discord.Interaction, hashrate: float):
         f"**Block Reward:** {current_reward:.2f} SPR\n"
         f"**SPR Price:** ${spr_price:.5f} USD\n"
         f"**Your Network Share:** {share * 100:.3f}%\n\n"
-        f"**Estimated Earnings:**\n"
+        f"**Estimated Earnings{f' ({growth:g}% monthly network growth)' if growth else ''}:**\n"
         f"**Hourly:** {rewards['Hour']:.2f} SPR (${rewards['Hour'] * spr_price:.3f} USD)\n"
         f"**Daily:** {rewards['Day']:.2f} SPR (${rewards['Day'] * spr_price:.3f} USD)\n"
         f"**Weekly:** {rewards['Week']:.2f} SPR (${rewards['Week'] * spr_price:.3f} USD)\n"
         f"**Monthly:** {rewards['Month']:.2f} SPR (${rewards['Month'] * spr_price:.3f} USD)\n"
         f"**Yearly:** {rewards['Year']:.2f} SPR (${rewards['Year'] * spr_price:.3f} USD)"
     )
+    if rig_rewards:
+        response += "\n\n**Rigs:**\n" + "\n".join(
+            f"**{h:g} kH/s:** {r['Day']:.2f} SPR/day, {r['Month']:.2f} SPR/month, "
+            f"{r['Year']:.2f} SPR/year"
+            for h, r in zip(rig_hashrates, rig_rewards)
+        )
 
     await interaction.followup.send(response)
 
@@ -0,0 +1,112 @@
+import logging
+import time
+from datetime import datetime, timezone
+
+import discord
+from discord import app_commands
+
+from utils.emission_schedule import DAA_SCORES_PER_SECOND, SOMPI_PER_SPR, get_schedule
+from utils.get_dag_info import get_network_info
+
+MILESTONES = (50, 75, 90, 99)  # percent of the max supply shown by default
+
+
+def daa_score_to_datetime(daa_score, current_daa_score):
+    seconds = (daa_score - current_daa_score) / DAA_SCORES_PER_SECOND
+    return datetime.fromtimestamp(time.time() + seconds, tz=timezone.utc)
+
+
+def supply_at(daa_score, current_daa_score, circulating_supply):
+    """Projected circulating SPR at a DAA score, from the emission schedule."""
+    emitted = get_schedule().emitted_between(current_daa_score, daa_score)
+    return circulating_supply + emitted / SOMPI_PER_SPR
+
+
+def daa_score_at_supply(supply, current_daa_score, circulating_supply):
+    """DAA score at which the circulating supply reaches `supply`, None if never."""
+    schedule = get_schedule()
+    missing = round((supply - circulating_supply) * SOMPI_PER_SPR)
+    if missing <= 0:
+        return current_daa_score
+    return schedule.daa_score_at(schedule.emitted(current_daa_score) + missing)
+
+
+def milestone_line(percent, max_supply, current_daa_score, circulating_supply):
+    daa_score = daa_score_at_supply(
+        max_supply * percent / 100, current_daa_score, circulating_supply
+    )
+    if daa_score is None:
+        return f"**{percent:g}% mined:** never at the current schedule"
+    if daa_score <= current_daa_score:
+        return f"**{percent:g}% mined:** already reached"
+    when = daa_score_to_datetime(daa_score, current_daa_score)
+    return f"**{percent:g}% mined:** {when:%Y-%m-%d} (DAA score {daa_score:,})"
+
+
+@app_commands.command(
+    name="supply", description="Project the SPR supply from the emission schedule."
+)
+@app_commands.describe(
+    date="Show the projected supply on this date (YYYY-MM-DD)",
+    percent="Show when this percentage of the max supply will be mined",
+)
+async def supply(
+    interaction: discord.Interaction, date: str = None, percent: float = None
+):
+    await interaction.response.defer()
+
+    try:
+        network_info = await get_network_info()
+        circulating_supply = float(network_info["Circulating Supply"])
+        max_supply = float(network_info["Max Supply"])
+        current_daa_score = int(network_info["virtualDaaScore"])
+    except Exception as err:
+        logging.error(f"Error fetching network info: {err}")
+        await interaction.followup.send(
+            "Error fetching network data. Please try again later."
+        )
+        return
+
+    lines = [
+        f"**Circulating Supply:** {circulating_supply:,.0f} SPR",
+        f"**Max Supply:** {max_supply:,.0f} SPR",
+        f"**Mined:** {circulating_supply / max_supply * 100:.3f}%",
+        "",
+    ]
+
+    if date is not None:
+        try:
+            target = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            await interaction.followup.send("Please provide a date as YYYY-MM-DD")
+            return
+        seconds = target.timestamp() - time.time()
+        if seconds < 0:
+            await interaction.followup.send("Please provide a date in the future")
+            return
+        daa_score = current_daa_score + int(seconds * DAA_SCORES_PER_SECOND)
+        projected = supply_at(daa_score, current_daa_score, circulating_supply)
+        lines.append(
+            f"**Supply on {date}:** {projected:,.0f} SPR "
+            f"({projected / max_supply * 100:.3f}% mined)"
+        )
+
+    if percent is not None:
+        if not 0 < percent <= 100:
+            await interaction.followup.send("Please provide a percentage in (0, 100]")
+            return
+        milestones = (percent,)
+    elif date is None:
+        milestones = MILESTONES
+    else:
+        milestones = ()
+    for p in milestones:
+        lines.append(
+            milestone_line(p, max_supply, current_daa_score, circulating_supply)
+        )
+
+    await interaction.followup.send("\n".join(lines))
+
+
+def setup(bot: discord.Client):
+    bot.tree.add_command(supply)
@@ -7,10 +7,19 @@ from discord.ext import commands
 from dotenv import load_dotenv
 
 from commands.calculate import setup as setup_calculate
+from commands.supply import setup as setup_supply
 from utils.spam import setup as setup_spam
-from utils.get_dag_info import update_network_info, network_info
+from utils.get_dag_info import (
+    apply_difficulty,
+    network_info,
+    refresh_network_info,
+    subscribe_network_state,
+)
 from utils.get_price_data import get_spr_price, get_spr_volume
+from utils.metrics_store import METRICS_DB_PATH, MetricsStore
+from utils.rename_scheduler import RenameScheduler
 from utils.subscribe_new_block import subscribe_block_added, BlockProcessor
+from spectred.SpectredChannelPool import close_all_pools
 
 
 load_dotenv()
@@ -35,26 +44,56 @@ CHANNEL_IDS = {
     "TPS_SPR_S": int(os.getenv("CHANNEL_TPS_SPR_S")),
 }
 
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-intents.guilds = True
-intents.messages = True
-bot = commands.Bot(command_prefix="/", intents=intents)
+PRESENCE_INTERVAL = 60  # seconds between activity updates
+
+
+class StatsBot(commands.Bot):
+    async def close(self):
+        await super().close()
+        if metrics_store is not None:
+            # write what the flush loop has not yet, or restarts lose it
+            await metrics_store.close()
+        await close_all_pools()
+
+
+# built by setup_bot(), not on import: spawned decode workers re-import this
+# module as __mp_main__ and must not start a bot of their own
+bot = None
+renames = None
+metrics_store = None
+processor = None
 
-previous_updates = {}
-processor = BlockProcessor()
+
+def setup_bot():
+    global bot, renames, metrics_store, processor
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    intents.guilds = True
+    intents.messages = True
+
+    bot = StatsBot(command_prefix="/", intents=intents)
+    bot.event(on_ready)
+    renames = RenameScheduler(bot.get_channel)
+    metrics_store = MetricsStore() if METRICS_DB_PATH else None
+    # every new block carries the difficulty, no need to poll the node for it
+    processor = BlockProcessor(
+        metrics_store=metrics_store, on_difficulty=apply_difficulty
+    )
+    return bot
 
 
 async def update_discord_channels():
-    global previous_updates
     await bot.wait_until_ready()
 
     first_run = True
 
     while True:
         logging.debug("Fetching network data...")
-        await update_network_info()
+        try:
+            await refresh_network_info()
+        except Exception as e:
+            logging.error(f"Error fetching network data: {e}")
         logging.debug("Getting TPS and SPR/s, Price & Volume...")
         tps, sprs = (
             processor.tps_sprs["tps"],
@@ -65,6 +104,11 @@ async def update_discord_channels():
         logging.debug(f"SPR Market Data: {spr_price} - {spr_volume}")
         logging.debug(f"TPS: {tps}, SPR/s: {sprs}")
 
+        if metrics_store is not None:
+            metrics_store.record_sample("price", spr_price)
+            metrics_store.record_sample("volume", spr_volume)
+            metrics_store.record_sample("difficulty", network_info.get("Difficulty"))
+
         if network_info:
             try:
                 logging.debug(f"network_info: {network_info}")
@@ -88,30 +132,16 @@ async def update_discord_channels():
                     "Mined Supply": f"⛏️: {mined_supply:.3f}% Mined",
                     "Nethash": f"⚡ {hashrate:.3f} MH/s",
                     "Blockreward": f"{block_reward_text}",
-                    "TPS_SPR_S": f"TPS: {tps} ┃ ({sprs} SPR/s)",
+                    "TPS_SPR_S": f"TPS: {tps} ┃ ({sprs} SPR/s)"
+                    if sprs is not None
+                    else f"TPS: {tps}",
                 }
 
-                # update channels only if changed
+                # channels are renamed concurrently, only if changed
                 logging.debug("Checking for changes...")
                 for key, channel_id in CHANNEL_IDS.items():
                     if key in updates:
-                        if (
-                            key not in previous_updates
-                            or previous_updates[key] != updates[key]
-                        ):
-                            logging.info(
-                                f"Value change detected for {key}: {previous_updates.get(key, 'None')} -> {updates[key]}"
-                            )
-                            channel = bot.get_channel(channel_id)
-                            if not channel:
-                                logging.error(
-                                    f"Channel {key} ({channel_id}) not found!"
-                                )
-                                continue
-                            logging.info(f"Updating {key} channel to: {updates[key]}")
-                            await channel.edit(name=updates[key])
-                            previous_updates[key] = updates[key]
-                            await asyncio.sleep(30)
+                        renames.submit(key, channel_id, updates[key])
 
                 # update bot display name with BPS or default name
                 if processor.bps["bps"] is not None:
@@ -129,23 +159,6 @@ async def update_discord_channels():
                     logging.error("Guild not found, cannot update bot name.")
                 await asyncio.sleep(5)  # Short delay to avoid rate limits
 
-                # update Discord activity status with latest DAA Score
-                if "virtualDaaScore" in network_info:
-                    daa_score = network_info["virtualDaaScore"]
-                    logging.debug(f"Received DAA score: {daa_score}")
-                if daa_score is not None:
-                    activity_text = f"DAA Score: {daa_score}"
-                else:
-                    activity_text = "Use /calc to estimate rewards"  # default activity
-
-                logging.info(f"Updating bot activity to: {activity_text}")
-                status = discord.Activity(
-                    type=discord.ActivityType.watching,
-                    name=activity_text,
-                )
-                await bot.change_presence(status=discord.Status.online, activity=status)
-                await asyncio.sleep(5)  # avoid rate limits
-
             except Exception as e:
                 logging.error(f"Error updating Discord channels: {e}")
 
@@ -157,18 +170,47 @@ async def update_discord_channels():
             await asyncio.sleep(600)
 
 
-@bot.event
+async def update_presence():
+    """Shows the DAA score, which notifications keep current, every minute."""
+    await bot.wait_until_ready()
+
+    while True:
+        daa_score = network_info.get("virtualDaaScore")
+        if daa_score is not None:
+            activity_text = f"DAA Score: {daa_score}"
+        else:
+            activity_text = "Use /calc to estimate rewards"  # default activity
+
+        logging.debug(f"Updating bot activity to: {activity_text}")
+        try:
+            status = discord.Activity(
+                type=discord.ActivityType.watching,
+                name=activity_text,
+            )
+            await bot.change_presence(status=discord.Status.online, activity=status)
+        except Exception as e:
+            logging.error(f"Error updating bot activity: {e}")
+        await asyncio.sleep(PRESENCE_INTERVAL)
+
+
 async def on_ready():
     logging.info(f"Logged in as {bot.user}")
     setup_calculate(bot)
+    setup_supply(bot)
     setup_spam(bot)
     await bot.tree.sync(guild=discord.Object(id=GUILD_ID))
     logging.info("commands synced successfully!")
 
+    if metrics_store is not None:
+        await metrics_store.open()
+        metrics_store.start()
     asyncio.create_task(subscribe_block_added(processor))
+    asyncio.create_task(subscribe_network_state())
+    asyncio.create_task(renames.run())
     asyncio.create_task(update_discord_channels())
+    asyncio.create_task(update_presence())
 
 
 if __name__ == "__main__":
     logging.info("Starting bot...")
-    bot.run(TOKEN)
+    setup_bot().run(TOKEN)
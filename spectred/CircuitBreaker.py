@@ -0,0 +1,96 @@
+# encoding: utf-8
+import logging
+import random
+import time
+
+_logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+FAILURE_THRESHOLD = 5  # consecutive failures before the breaker opens
+BACKOFF_MIN = 1  # seconds the breaker stays open after the first trip
+BACKOFF_MAX = 300  # upper bound for the open period
+JITTER = 0.2  # +/- fraction applied to every open period
+
+
+class CircuitBreaker(object):
+    """
+    Stops traffic to a failing node for a while instead of retrying it harder.
+
+    closed: requests pass, consecutive failures are counted.
+    open: requests are refused until the (jittered, exponential) backoff ends.
+    half-open: one probe request is let through; success closes the breaker,
+    failure opens it again with a doubled backoff.
+    """
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=FAILURE_THRESHOLD,
+        backoff_min=BACKOFF_MIN,
+        backoff_max=BACKOFF_MAX,
+        jitter=JITTER,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0  # consecutive times the breaker opened
+        self.times_opened = 0  # lifetime counter, shown in the node health log
+        self.open_until = 0.0
+        self.__probe_in_flight = False
+
+    def __set_state(self, state):
+        if state != self.state:
+            _logger.info(f"Circuit breaker {self.name}: {self.state} -> {state}")
+            self.state = state
+
+    @property
+    def is_open(self):
+        """True while the node should be skipped entirely."""
+        if self.state == OPEN and time.monotonic() >= self.open_until:
+            self.__set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            return self.__probe_in_flight
+        return self.state == OPEN
+
+    def allow_request(self):
+        if self.is_open:
+            return False
+        if self.state == HALF_OPEN:
+            self.__probe_in_flight = True
+        return True
+
+    def backoff(self):
+        delay = min(self.backoff_min * 2 ** max(self.trips - 1, 0), self.backoff_max)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def record_success(self):
+        self.failures = 0
+        self.trips = 0
+        self.__probe_in_flight = False
+        self.__set_state(CLOSED)
+
+    def record_cancelled(self):
+        # an abandoned half-open probe must not block the node forever
+        self.__probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.__probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trips += 1
+            self.times_opened += 1
+            delay = self.backoff()
+            self.open_until = time.monotonic() + delay
+            self.__set_state(OPEN)
+            _logger.warning(
+                f"Circuit breaker {self.name} open for {delay:.1f}s "
+                f"after {self.failures} failures"
+            )
@@ -0,0 +1,187 @@
+# encoding: utf-8
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import grpc
+
+from spectred.SpectredStream import SpectredStream
+from spectred.SpectredThread import CHANNEL_OPTIONS, SpectredCommunicationError
+
+_logger = logging.getLogger(__name__)
+
+IDLE_TIMEOUT = 300  # seconds a channel may stay unused before it is closed
+
+_pools = {}
+_live_channels = 0
+
+
+def live_channels():
+    """Returns the number of gRPC channels currently open across all pools."""
+    return _live_channels
+
+
+def get_channel_pool(spectred_host, spectred_port, **kwargs):
+    """
+    Borrows the shared channel pool for a spectred host, creating it on first use.
+
+    Every borrow is given back with release_channel_pool(); the pool closes
+    once its last borrower is gone.
+    """
+    key = f"{spectred_host}:{spectred_port}"
+    if key not in _pools:
+        _pools[key] = SpectredChannelPool(spectred_host, spectred_port, **kwargs)
+    _pools[key].borrowers += 1
+    return _pools[key]
+
+
+async def release_channel_pool(pool):
+    pool.borrowers -= 1
+    if pool.borrowers <= 0:
+        if _pools.get(pool.target) is pool:
+            del _pools[pool.target]
+        await pool.close()
+
+
+async def close_all_pools():
+    """Closes every pool regardless of borrowers, for shutdown."""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.close()
+
+
+class _PooledChannel(object):
+    def __init__(self, target):
+        global _live_channels
+        self.channel = grpc.aio.insecure_channel(
+            target,
+            compression=grpc.Compression.Gzip,
+            options=CHANNEL_OPTIONS,
+        )
+        self.active = 0
+        self.last_used = time.monotonic()
+        self.broken = False
+        self.closed = False
+        _live_channels += 1
+
+    async def close(self):
+        global _live_channels
+        if self.closed:
+            return
+        self.closed = True
+        _live_channels -= 1
+        await self.channel.close()
+
+
+class SpectredChannelPool(object):
+    def __init__(self, spectred_host, spectred_port, size=1, idle_timeout=IDLE_TIMEOUT):
+        self.spectred_host = spectred_host
+        self.spectred_port = spectred_port
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.borrowers = 0  # clients sharing the pool, see get_channel_pool()
+        self.__slots = [None] * size
+        self.__next_slot = 0
+        self.__retired = set()
+        self.__stream = None
+        self.__stream_lock = asyncio.Lock()
+        self.__reaper = None
+
+    @property
+    def target(self):
+        return f"{self.spectred_host}:{self.spectred_port}"
+
+    @property
+    def live_channels(self):
+        return sum(1 for c in self.__slots if c is not None) + len(self.__retired)
+
+    def open(self):
+        # eagerly connect every slot instead of waiting for the first request
+        for i, pooled in enumerate(self.__slots):
+            if pooled is None:
+                self.__slots[i] = _PooledChannel(self.target)
+                _logger.debug(f"Opened channel to {self.target} (slot {i})")
+
+    async def stream(self):
+        """Returns the multiplexed MessageStream of this host, (re)opening it if needed."""
+        async with self.__stream_lock:
+            if self.__stream is None or self.__stream.closed:
+                self.__stream = SpectredStream(self)
+                await self.__stream.open()
+            return self.__stream
+
+    async def close(self):
+        if self.__reaper is not None:
+            self.__reaper.cancel()
+            self.__reaper = None
+        if self.__stream is not None:
+            await self.__stream.close()
+            self.__stream = None
+        slots, self.__slots = self.__slots, [None] * self.size
+        for pooled in [c for c in slots if c is not None] + list(self.__retired):
+            await pooled.close()
+        self.__retired.clear()
+        _logger.debug(f"Closed channel pool for {self.target}")
+
+    async def evict_idle(self):
+        now = time.monotonic()
+        for i, pooled in enumerate(self.__slots):
+            if (
+                pooled is not None
+                and pooled.active == 0
+                and now - pooled.last_used > self.idle_timeout
+            ):
+                self.__slots[i] = None
+                await pooled.close()
+                _logger.debug(f"Evicted idle channel to {self.target} (slot {i})")
+
+    async def __reap(self):
+        # close channels while they sit idle, not when the next request needs one
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            await self.evict_idle()
+
+    def __acquire(self):
+        if self.__reaper is None or self.__reaper.done():
+            self.__reaper = asyncio.create_task(self.__reap())
+
+        i = self.__next_slot
+        self.__next_slot = (i + 1) % self.size
+
+        pooled = self.__slots[i]
+        if pooled is None or pooled.broken:
+            pooled = self.__slots[i] = _PooledChannel(self.target)
+            _logger.debug(f"Opened channel to {self.target} (slot {i})")
+
+        pooled.active += 1
+        return i, pooled
+
+    async def __release(self, i, pooled, failed):
+        pooled.active -= 1
+        pooled.last_used = time.monotonic()
+
+        if failed and not pooled.broken:
+            # take the channel out of rotation, the next request reconnects
+            pooled.broken = True
+            if self.__slots[i] is pooled:
+                self.__slots[i] = None
+            self.__retired.add(pooled)
+            _logger.debug(f"Channel to {self.target} failed, reconnecting")
+
+        if pooled in self.__retired and pooled.active == 0:
+            self.__retired.discard(pooled)
+            await pooled.close()
+
+    @asynccontextmanager
+    async def channel(self):
+        i, pooled = self.__acquire()
+        failed = False
+        try:
+            yield pooled.channel
+        except SpectredCommunicationError:
+            failed = True
+            raise
+        finally:
+            await self.__release(i, pooled, failed)
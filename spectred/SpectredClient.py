@@ -1,56 +1,146 @@
 # encoding: utf-8
 import asyncio
+import random
+import time
+from collections import deque
 
+from spectred.CircuitBreaker import CircuitBreaker
+from spectred.SpectredChannelPool import get_channel_pool, release_channel_pool
 from spectred.SpectredThread import SpectredThread, SpectredCommunicationError
 import logging
 
 _logger = logging.getLogger(__name__)
 
+EWMA_ALPHA = 0.3  # weight of the newest sample in latency/error averages
+LATENCY_SAMPLES = 100  # successful requests kept for the latency percentile
+RETRY_BACKOFF = 0.3  # seconds before the first retry, doubled per attempt
+
 
 # pipenv run python -m grpc_tools.protoc -I./protos --python_out=. --grpc_python_out=. ./protos/rpc.proto ./protos/messages.proto ./protos/p2p.proto
 # win: pipenv run python -m grpc_tools.protoc -I".\spectred\protos" --python_out=".\\spectred" --grpc_python_out=".\\spectred" ".\spectred\protos\rpc.proto" ".\spectred\protos\messages.proto" ".\spectred\protos\p2p.proto"
 class SpectredClient(object):
-    def __init__(self, spectred_host, spectred_port):
+    def __init__(self, spectred_host, spectred_port, multiplex=False):
         self.spectred_host = spectred_host
         self.spectred_port = spectred_port
         self.server_version = None
         self.is_utxo_indexed = None
         self.is_synced = None
         self.p2p_id = None
+        self.multiplex = multiplex
+        self.channel_pool = get_channel_pool(spectred_host, spectred_port)
+        self.__closed = False
+        self.latency = None  # EWMA of successful request latency in seconds
+        self.error_rate = 0.0  # EWMA of failed requests, 0..1
+        self.__latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.breaker = CircuitBreaker(f"{spectred_host}:{spectred_port}")
+
+    def __str__(self):
+        return f"{self.spectred_host}:{self.spectred_port}"
+
+    @property
+    def latency_p95(self):
+        """95th percentile of recent request latencies, None until enough samples."""
+        if len(self.__latencies) < 10:
+            return None
+        return sorted(self.__latencies)[int(len(self.__latencies) * 0.95) - 1]
+
+    def record_latency(self, latency):
+        self.__latencies.append(latency)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += EWMA_ALPHA * (latency - self.latency)
 
-    async def ping(self):
+    def record_result(self, latency, ok):
+        if ok:
+            self.record_latency(latency)
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+
+    async def ping(self, timeout=60):
         try:
-            info = await self.request("getInfoRequest")
-            self.server_version = info["getInfoResponse"]["serverVersion"]
-            self.is_utxo_indexed = info["getInfoResponse"]["isUtxoIndexed"]
-            self.is_synced = info["getInfoResponse"]["isSynced"]
-            self.p2p_id = info["getInfoResponse"]["p2pId"]
+            info = await self.request("getInfoRequest", timeout=timeout)
+            self.server_version = info["getInfoResponse"].get("serverVersion")
+            self.is_utxo_indexed = info["getInfoResponse"].get("isUtxoIndexed", False)
+            self.is_synced = info["getInfoResponse"].get("isSynced", False)
+            self.p2p_id = info["getInfoResponse"].get("p2pId")
             return info
 
         except Exception:
             return False
 
-    async def request(self, command, params=None, timeout=60, retry=0):
+    async def request(self, command, params=None, timeout=60, retry=0, raw=False):
         _logger.debug(f"Request start: {command}, {params}")
         for i in range(1 + retry):
+            if not self.breaker.allow_request():
+                raise SpectredCommunicationError(f"Circuit breaker for {self} is open")
+
+            start = time.monotonic()
             try:
-                with SpectredThread(self.spectred_host, self.spectred_port) as t:
-                    resp = await t.request(
-                        command, params, wait_for_response=True, timeout=timeout
-                    )
-                    _logger.debug("Request end")
-                    return resp
+                resp = await self.__send(command, params, timeout, raw)
+                self.record_result(time.monotonic() - start, True)
+                self.breaker.record_success()
+                _logger.debug("Request end")
+                return resp
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
             except SpectredCommunicationError:
+                self.record_result(time.monotonic() - start, False)
+                self.breaker.record_failure()
                 if i == retry:
                     _logger.debug("Retries done.")
                     raise
                 else:
                     _logger.debug("Wait for next retry.")
-                    await asyncio.sleep(0.3)
+                    await asyncio.sleep(RETRY_BACKOFF * 2**i * random.uniform(0.5, 1.5))
             except Exception:
                 _logger.exception("I should not be here.")
                 raise
 
-    async def notify(self, command, params, callback):
-        t = SpectredThread(self.spectred_host, self.spectred_port, async_thread=True)
-        return await t.notify(command, params, callback)
+    async def __send(self, command, params, timeout, raw):
+        if self.multiplex:
+            stream = await self.channel_pool.stream()
+            return await stream.request(command, params, timeout=timeout, raw=raw)
+
+        async with self.channel_pool.channel() as channel:
+            with SpectredThread(
+                self.spectred_host, self.spectred_port, channel=channel
+            ) as t:
+                return await t.request(
+                    command, params, wait_for_response=True, timeout=timeout, raw=raw
+                )
+
+    async def notify(self, command, params, callback, raw=False):
+        if not self.breaker.allow_request():
+            raise SpectredCommunicationError(f"Circuit breaker for {self} is open")
+        delivered = False
+
+        async def on_response(resp):
+            nonlocal delivered
+            if not delivered:
+                # the subscription works, close the breaker for the node's requests
+                delivered = True
+                self.breaker.record_success()
+            if callback:
+                await callback(resp)
+
+        try:
+            async with self.channel_pool.channel() as channel:
+                t = SpectredThread(
+                    self.spectred_host, self.spectred_port, channel=channel
+                )
+                return await t.notify(command, params, on_response, raw=raw)
+        except asyncio.CancelledError:
+            if not delivered:
+                self.breaker.record_cancelled()
+            raise
+        except SpectredCommunicationError:
+            self.record_result(None, False)
+            self.breaker.record_failure()
+            raise
+
+    async def close(self):
+        # the pool is shared by every client of this host, give back our borrow only
+        if not self.__closed:
+            self.__closed = True
+            await release_channel_pool(self.channel_pool)
@@ -1,37 +1,211 @@
 # encoding: utf-8
 import asyncio
+import logging
+import time
 
 from spectred.SpectredClient import SpectredClient
 
 # pipenv run python -m grpc_tools.protoc -I./protos --python_out=. --grpc_python_out=. ./protos/rpc.proto ./protos/messages.proto ./protos/p2p.proto
 from spectred.SpectredThread import SpectredCommunicationError
 
+_logger = logging.getLogger(__name__)
+
+PROBE_INTERVAL = 30  # seconds between background health probes
+PROBE_TIMEOUT = 3  # deadline for a single health ping
+MAX_ERROR_RATE = 0.5  # nodes failing more often than this are avoided
+HEDGE_DELAY = 1.0  # seconds before hedging while a node has no p95 latency yet
+HEDGE_BUDGET = 0.1  # hedged requests allowed per request sent
+HEDGE_BURST = 5  # hedges allowed on top of the budget
+
 
 class SpectredMultiClient(object):
-    def __init__(self, hosts: list[str]):
-        self.spectreds = [SpectredClient(*h.split(":")) for h in hosts]
+    def __init__(self, hosts: list[str], multiplex=False, hedge=False):
+        self.spectreds = [
+            SpectredClient(*h.split(":"), multiplex=multiplex) for h in hosts
+        ]
+        self.hedge = hedge
+        self.requests_sent = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.__probe_task = None
+        self.__pending_pings = set()
+
+    def __is_usable(self, k):
+        return k.is_utxo_indexed and k.is_synced and not k.breaker.is_open
+
+    def __ranked(self):
+        """Usable nodes, healthy ones first, each group ordered by latency."""
+        usable = [k for k in self.spectreds if self.__is_usable(k)]
+        return sorted(
+            usable,
+            key=lambda k: (
+                k.error_rate > MAX_ERROR_RATE,
+                k.latency if k.latency is not None else float("inf"),
+            ),
+        )
 
     def __get_spectred(self):
-        for k in self.spectreds:
-            if k.is_utxo_indexed and k.is_synced:
-                return k
+        ranked = self.__ranked()
+        if not ranked:
+            raise SpectredCommunicationError("No healthy spectred node available")
+        return ranked[0]
 
-    async def initialize_all(self):
-        tasks = [asyncio.create_task(k.ping()) for k in self.spectreds]
+    async def initialize_all(self, timeout=PROBE_TIMEOUT):
+        await asyncio.gather(*(k.ping(timeout=timeout) for k in self.spectreds))
 
+    async def initialize_any(self, timeout=PROBE_TIMEOUT):
+        """Pings all nodes concurrently and returns as soon as one is usable."""
+        tasks = [asyncio.create_task(k.ping(timeout=timeout)) for k in self.spectreds]
+        # the slower pings keep running and update their node when they finish
+        self.__pending_pings.update(tasks)
         for t in tasks:
-            await t
+            t.add_done_callback(self.__pending_pings.discard)
+
+        for finished in asyncio.as_completed(tasks):
+            await finished
+            ranked = self.__ranked()
+            if ranked:
+                return ranked[0]
+        return None
+
+    def start_health_probe(self, interval=PROBE_INTERVAL, timeout=PROBE_TIMEOUT):
+        if self.__probe_task is None or self.__probe_task.done():
+            self.__probe_task = asyncio.create_task(
+                self.__probe_loop(interval, timeout)
+            )
+
+    def stop_health_probe(self):
+        if self.__probe_task is not None:
+            self.__probe_task.cancel()
+            self.__probe_task = None
+
+    async def __probe_loop(self, interval, timeout):
+        while True:
+            await self.initialize_all(timeout=timeout)
+            _logger.debug(
+                "Node health: "
+                + ", ".join(
+                    f"{k} (synced={k.is_synced}, latency={k.latency}, "
+                    f"errors={k.error_rate:.2f}, breaker={k.breaker.state}, "
+                    f"opened={k.breaker.times_opened})"
+                    for k in self.spectreds
+                )
+                + f" | hedges sent {self.hedges_sent}, won {self.hedges_won}"
+            )
+            await asyncio.sleep(interval)
 
-    async def request(self, command, params=None, timeout=60):
+    def __can_hedge(self, command):
+        # only idempotent reads may be sent twice
+        return command.lower().startswith("get") and (
+            self.hedges_sent < self.requests_sent * HEDGE_BUDGET + HEDGE_BURST
+        )
+
+    async def __hedged_request(self, command, params, timeout, retry, raw):
+        ranked = self.__ranked()
+        if not ranked:
+            raise SpectredCommunicationError("No healthy spectred node available")
+
+        start = time.monotonic()
+        primary = asyncio.create_task(
+            ranked[0].request(command, params, timeout=timeout, retry=retry, raw=raw)
+        )
+        hedge = None
         try:
+            if len(ranked) < 2:
+                return await primary
+
+            delay = ranked[0].latency_p95 or HEDGE_DELAY
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self.__can_hedge(command):
+                return await primary
+
+            self.hedges_sent += 1
+            _logger.debug(f"Hedging {command} to {ranked[1]} after {delay:.3f}s")
+            hedge = asyncio.create_task(
+                ranked[1].request(
+                    command, params, timeout=timeout, retry=retry, raw=raw
+                )
+            )
+
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for t in done:
+                    if t.exception() is None:
+                        if t is hedge:
+                            self.hedges_won += 1
+                            # the abandoned primary took at least this long
+                            ranked[0].record_latency(time.monotonic() - start)
+                        return t.result()
+            return primary.result()  # both failed, raise the primary's error
+        finally:
+            # also stops both requests when the caller itself is cancelled
+            for t in (primary, hedge):
+                if t is not None and not t.done():
+                    t.cancel()
+
+    async def request(self, command, params=None, timeout=60, hedge=None, raw=False):
+        self.requests_sent += 1
+        hedge = self.hedge if hedge is None else hedge
+        try:
+            if hedge:
+                return await self.__hedged_request(
+                    command, params, timeout, retry=1, raw=raw
+                )
             return await self.__get_spectred().request(
-                command, params, timeout=timeout, retry=1
+                command, params, timeout=timeout, retry=1, raw=raw
             )
         except SpectredCommunicationError:
             await self.initialize_all()
+            if hedge:
+                return await self.__hedged_request(
+                    command, params, timeout, retry=3, raw=raw
+                )
             return await self.__get_spectred().request(
-                command, params, timeout=timeout, retry=3
+                command, params, timeout=timeout, retry=3, raw=raw
             )
 
-    async def notify(self, command, params, callback):
-        return await self.__get_spectred().notify(command, params, callback)
+    async def request_many(self, requests, timeout=60):
+        """
+        Runs several requests concurrently under one shared deadline.
+
+        requests is a list of commands or (command, params) pairs. Results are
+        returned in the same order; an item that failed or missed the deadline
+        is returned as its exception instead of failing the whole batch.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        async def one(command, params):
+            return await self.request(
+                command, params, timeout=max(deadline - loop.time(), 0)
+            )
+
+        tasks = [
+            asyncio.create_task(one(*((r, None) if isinstance(r, str) else r)))
+            for r in requests
+        ]
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for r, t in zip(requests, tasks):
+            if t in pending:
+                results.append(SpectredCommunicationError(f"{r} missed the deadline"))
+            elif t.exception() is not None:
+                results.append(t.exception())
+            else:
+                results.append(t.result())
+        return results
+
+    async def notify(self, command, params, callback, raw=False):
+        return await self.__get_spectred().notify(command, params, callback, raw=raw)
+
+    async def close(self):
+        self.stop_health_probe()
+        for k in self.spectreds:
+            await k.close()
@@ -0,0 +1,64 @@
+# encoding: utf-8
+import json
+from functools import lru_cache
+
+from google.protobuf import json_format
+from google.protobuf.message import Message
+
+from .messages_pb2 import SpectredRequest, SpectredResponse
+
+MESSAGE_STREAM = "/protowire.RPC/MessageStream"
+ID_FIELD_TAG = b"\xa8\x06"  # SpectredRequest.id: field 101, wire type varint
+
+
+def message_stream(channel):
+    """MessageStream call that sends pre-encoded bytes as they are."""
+    return channel.stream_stream(
+        MESSAGE_STREAM,
+        request_serializer=None,
+        response_deserializer=SpectredResponse.FromString,
+    )
+
+
+def _encode_varint(value):
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+@lru_cache(maxsize=256)
+def _encode_payload(command, params_json=None):
+    msg = SpectredRequest()
+    payload = getattr(msg, command)
+    if params_json:
+        json_format.Parse(params_json, payload)
+    payload.SetInParent()
+    return msg.SerializeToString()
+
+
+def encode_request(command, params=None, request_id=0):
+    """
+    Serializes a SpectredRequest.
+
+    Parameterless and constant-parameter requests are built once and served
+    from a cache. Typed protobuf params are copied in without a JSON round
+    trip. Protobuf allows fields in any order, so the request id is prepended
+    to the cached bytes instead of re-encoding the message.
+    """
+    if isinstance(params, Message):
+        msg = SpectredRequest()
+        getattr(msg, command).CopyFrom(params)
+        body = msg.SerializeToString()
+    elif isinstance(params, dict) and params:
+        body = _encode_payload(command, json.dumps(params, sort_keys=True))
+    elif isinstance(params, str) and params:
+        body = _encode_payload(command, params)
+    else:
+        body = _encode_payload(command)
+
+    if request_id:
+        return ID_FIELD_TAG + _encode_varint(request_id) + body
+    return body
@@ -0,0 +1,150 @@
+# encoding: utf-8
+import asyncio
+import itertools
+import logging
+from collections import defaultdict, deque
+
+import grpc
+from google.protobuf import json_format
+
+from .SpectredRequestEncoder import encode_request, message_stream
+from .SpectredThread import SpectredCommunicationError
+
+_logger = logging.getLogger(__name__)
+
+
+def response_name(command):
+    if command.endswith("Request"):
+        return command[: -len("Request")] + "Response"
+    return command
+
+
+class SpectredStream(object):
+    """
+    One long-lived MessageStream carrying many in-flight requests.
+
+    Every request is tagged with an id. Responses are matched back by that id,
+    or, if the node does not echo it, by response type in request order.
+    """
+
+    def __init__(self, channel_pool):
+        self.channel_pool = channel_pool
+        self.closed = False
+        self.__closing = False
+        self.__outgoing = asyncio.Queue()
+        self.__pending = {}
+        self.__pending_by_type = defaultdict(deque)
+        self.__ids = itertools.count(1)
+        self.__call = None
+        self.__reader = None
+
+    @property
+    def in_flight(self):
+        return len(self.__pending)
+
+    async def open(self):
+        opened = asyncio.get_running_loop().create_future()
+        self.__reader = asyncio.create_task(self.__run(opened))
+        await opened
+        _logger.debug(f"Opened multiplexed stream to {self.channel_pool.target}")
+
+    async def close(self):
+        if self.closed:
+            return
+        self.__closing = True
+        self.__outgoing.put_nowait(None)
+        if self.__call is not None:
+            self.__call.cancel()
+        if self.__reader is not None:
+            await asyncio.gather(self.__reader, return_exceptions=True)
+
+    async def __requests(self):
+        while True:
+            msg = await self.__outgoing.get()
+            if msg is None:
+                return
+            yield msg
+
+    async def __run(self, opened):
+        """Holds the pool channel for the stream's lifetime and reads responses."""
+        try:
+            async with self.channel_pool.channel() as channel:
+                self.__call = message_stream(channel)(self.__requests())
+                opened.set_result(None)
+                error = await self.__read()
+                if not self.__closing:
+                    # let the pool retire the channel so the next stream reconnects
+                    raise error
+        except SpectredCommunicationError as e:
+            if not opened.done():
+                opened.set_exception(e)
+        except Exception as e:
+            if not opened.done():
+                opened.set_exception(e)
+            raise
+        finally:
+            self.closed = True
+            _logger.debug(f"Multiplexed stream to {self.channel_pool.target} closed")
+
+    async def __read(self):
+        """Reads until the stream ends, then fails what is pending with the cause."""
+        error = SpectredCommunicationError("Stream failed")
+        try:
+            async for resp in self.__call:
+                self.__dispatch(resp)
+            error = SpectredCommunicationError("Stream closed by node")
+        except grpc.aio.AioRpcError as e:
+            error = SpectredCommunicationError(str(e))
+        except asyncio.CancelledError:
+            error = SpectredCommunicationError("Stream cancelled")
+        finally:
+            self.closed = True
+            # end the request generator, or gRPC's consumer task waits on it forever
+            self.__outgoing.put_nowait(None)
+            self.__call.cancel()
+            for fut in self.__pending.values():
+                if not fut.done():
+                    fut.set_exception(error)
+            self.__pending.clear()
+            self.__pending_by_type.clear()
+        return error
+
+    def __dispatch(self, resp):
+        name = resp.WhichOneof("payload")
+        waiting = self.__pending_by_type.get(name)
+
+        fut = self.__pending.pop(resp.id, None) if resp.id else None
+        if fut is not None:
+            if waiting and resp.id in waiting:
+                waiting.remove(resp.id)
+        else:
+            while waiting and fut is None:
+                fut = self.__pending.pop(waiting.popleft(), None)
+
+        if fut is None:
+            _logger.debug(f"Dropping unmatched message on stream: {name}")
+        elif not fut.done():
+            fut.set_result(resp)
+
+    async def request(self, command, params=None, timeout=60, raw=False):
+        if self.closed:
+            raise SpectredCommunicationError("Stream is closed")
+
+        request_id = next(self.__ids)
+        fut = asyncio.get_running_loop().create_future()
+        self.__pending[request_id] = fut
+        self.__pending_by_type[response_name(command)].append(request_id)
+        self.__outgoing.put_nowait(encode_request(command, params, request_id))
+
+        try:
+            resp = await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            raise SpectredCommunicationError(f"{command} timed out after {timeout}s")
+        finally:
+            if self.__pending.pop(request_id, None) is not None:
+                waiting = self.__pending_by_type[response_name(command)]
+                if request_id in waiting:
+                    waiting.remove(request_id)
+
+        resp.ClearField("id")
+        return resp if raw else json_format.MessageToDict(resp)
@@ -8,8 +8,13 @@ from grpc._channel import _MultiThreadedRendezvous
 
 from . import messages_pb2_grpc
 from .messages_pb2 import SpectredRequest
+from .SpectredRequestEncoder import encode_request, message_stream
 
 MAX_MESSAGE_LENGTH = 1024 * 1024 * 1024  # 1GB
+CHANNEL_OPTIONS = [
+    ("grpc.max_send_message_length", MAX_MESSAGE_LENGTH),
+    ("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH),
+]
 
 
 class SpectredCommunicationError(Exception):
@@ -20,30 +25,28 @@ class SpectredCommunicationError(Exception):
 
 
 class SpectredThread(object):
-    def __init__(self, spectred_host, spectred_port, async_thread=True):
+    def __init__(self, spectred_host, spectred_port, async_thread=True, channel=None):
         self.spectred_host = spectred_host
         self.spectred_port = spectred_port
 
-        if async_thread:
+        if channel is not None:
+            # borrowed from a SpectredChannelPool, the pool owns its lifecycle
+            self.channel = channel
+        elif async_thread:
             self.channel = grpc.aio.insecure_channel(
                 f"{spectred_host}:{spectred_port}",
                 compression=grpc.Compression.Gzip,
-                options=[
-                    ("grpc.max_send_message_length", MAX_MESSAGE_LENGTH),
-                    ("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH),
-                ],
+                options=CHANNEL_OPTIONS,
             )
         else:
             self.channel = grpc.insecure_channel(
                 f"{spectred_host}:{spectred_port}",
                 compression=grpc.Compression.Gzip,
-                options=[
-                    ("grpc.max_send_message_length", MAX_MESSAGE_LENGTH),
-                    ("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH),
-                ],
+                options=CHANNEL_OPTIONS,
             )
             self.__sync_queue = Queue()
         self.stub = messages_pb2_grpc.RPCStub(self.channel)
+        self.message_stream = message_stream(self.channel)
 
         self.__queue = asyncio.queues.Queue()
 
@@ -55,40 +58,34 @@ class SpectredThread(object):
     def __exit__(self, *args):
         self.__closing = True
 
-    async def request(self, command, params=None, wait_for_response=True, timeout=5):
+    async def request(
+        self, command, params=None, wait_for_response=True, timeout=5, raw=False
+    ):
         if wait_for_response:
             try:
-                async for resp in self.stub.MessageStream(
+                async for resp in self.message_stream(
                     self.yield_cmd(command, params), timeout=timeout
                 ):
                     self.__queue.put_nowait("done")
-                    return json_format.MessageToDict(resp)
+                    return resp if raw else json_format.MessageToDict(resp)
             except grpc.aio._call.AioRpcError as e:
                 raise SpectredCommunicationError(str(e))
 
-    async def notify(self, command, params=None, callback_func=None):
+    async def notify(self, command, params=None, callback_func=None, raw=False):
         try:
-            async for resp in self.stub.MessageStream(self.yield_cmd(command, params)):
+            async for resp in self.message_stream(self.yield_cmd(command, params)):
                 # self.__queue.put_nowait("done")
                 if callback_func:
-                    await callback_func(json_format.MessageToDict(resp))
+                    # raw hands over the SpectredResponse protobuf untouched
+                    await callback_func(
+                        resp if raw else json_format.MessageToDict(resp)
+                    )
 
         except (grpc.aio._call.AioRpcError, _MultiThreadedRendezvous) as e:
             raise SpectredCommunicationError(str(e))
 
     async def yield_cmd(self, cmd, params=None):
-        msg = SpectredRequest()
-        msg2 = getattr(msg, cmd)
-        payload = params
-
-        if payload:
-            if isinstance(payload, dict):
-                json_format.ParseDict(payload, msg2)
-            if isinstance(payload, str):
-                json_format.Parse(payload, msg2)
-
-        msg2.SetInParent()
-        yield msg
+        yield encode_request(cmd, params)
         await self.__queue.get()
 
     def yield_cmd_sync(self, cmd, params=None):
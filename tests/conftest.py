@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the utils modules read their node list on import
+os.environ.setdefault("SPECTRED_HOSTS", "localhost:18110")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from spectred.rpc_pb2 import RpcBlock
+from utils.block_decode_pool import BlockDecoder
+
+BURST_BLOCKS = 1000
+TXS_PER_BLOCK = 60
+
+
+def make_block(i, txs=TXS_PER_BLOCK):
+    block = RpcBlock()
+    block.verboseData.hash = f"{i:064x}"
+    block.verboseData.difficulty = 1.0
+    block.header.blueScore = i
+    block.header.timestamp = 1700000000000 + i * 100
+    for t in range(txs):
+        tx = block.transactions.add()
+        tx.verboseData.transactionId = f"{t:064x}"
+        for o in range(3):
+            output = tx.outputs.add()
+            output.amount = 5 + o
+            output.verboseData.scriptPublicKeyAddress = "spectre:q" + "x" * 60
+    return block
+
+
+async def decode_with_ticker(decoder, blocks):
+    """Decodes the burst while a 1ms ticker measures how late the loop runs it."""
+    lags = []
+    stop = False
+
+    async def ticker():
+        while not stop:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    decoded = await decoder.decode(blocks)
+    stop = True
+    await task
+    return decoded, max(lags)
+
+
+def test_process_pool_keeps_the_loop_responsive_during_a_burst():
+    blocks = [make_block(i) for i in range(BURST_BLOCKS)]
+
+    async def run():
+        inline = BlockDecoder("none")
+        pool = BlockDecoder("process", workers=4)
+        try:
+            # start the workers before measuring
+            await pool.decode([make_block(10**6 + i) for i in range(400)])
+            expected, inline_lag = await decode_with_ticker(inline, blocks)
+            decoded, pool_lag = await decode_with_ticker(pool, blocks)
+        finally:
+            pool.close()
+        return expected, inline_lag, decoded, pool_lag
+
+    expected, inline_lag, decoded, pool_lag = asyncio.run(run())
+    assert decoded == expected
+    assert pool_lag < inline_lag / 2, (pool_lag, inline_lag)
+
+
+def test_thread_pool_decodes_like_inline():
+    blocks = [make_block(i, txs=20) for i in range(100)]
+
+    async def run():
+        pool = BlockDecoder("thread", workers=2)
+        try:
+            return await pool.decode(blocks), await BlockDecoder("none").decode(blocks)
+        finally:
+            pool.close()
+
+    decoded, expected = asyncio.run(run())
+    assert decoded == expected
@@ -0,0 +1,80 @@
+import random
+from collections import deque
+
+from utils.sompi_to_spr import sompis_to_spr
+from utils.subscribe_new_block import BlockProcessor
+
+WINDOW = 100  # blocks, the window the baseline kept
+
+
+def recorded_blocks(count, seed=12):
+    """blockAddedNotification blocks as MessageToDict hands them over."""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(count):
+        blocks.append(
+            {
+                "header": {
+                    "blueScore": str(i),
+                    "timestamp": str(1700000000000 + 100 * i),
+                },
+                "verboseData": {"hash": f"{i:064x}", "difficulty": 1.5e12},
+                "transactions": [
+                    {
+                        "outputs": [
+                            {
+                                "amount": str(rng.randrange(1, 10**13)),
+                                "verboseData": {"scriptPublicKeyAddress": "spectre:q"},
+                            }
+                            for _ in range(rng.randint(1, 4))
+                        ],
+                        "verboseData": {"transactionId": f"{i:032x}{t:032x}"},
+                    }
+                    for t in range(rng.randint(1, 30))
+                ],
+            }
+        )
+    return blocks
+
+
+def baseline_tps_sprs(window):
+    """TPS and SPR/s summed over the whole window, as before the running totals."""
+    if len(window) < 30:
+        return None
+    total_txs = sum(len(block["transactions"]) for block in window)
+    total_sompi = sum(
+        int(output["amount"])
+        for block in window
+        for tx in block["transactions"]
+        for output in tx["outputs"]
+    )
+    return {
+        "tps": round(total_txs / len(window), 1),
+        "sprs": round(sompis_to_spr(total_sompi) / len(window), 1),
+    }
+
+
+def test_running_totals_match_window_sums():
+    processor = BlockProcessor(tps_window=WINDOW)
+    window = deque(maxlen=WINDOW)
+    for block in recorded_blocks(2000):
+        window.append(block)
+        processor.add_block_to_cache(block)
+        processor.calculate_tps_spr_s()
+
+        expected = baseline_tps_sprs(window)
+        if expected is None:
+            assert processor.tps_sprs == {"tps": None, "sprs": None}
+        else:
+            assert processor.tps_sprs == expected
+
+
+def test_duplicate_block_leaves_totals_unchanged():
+    processor = BlockProcessor(tps_window=WINDOW)
+    blocks = recorded_blocks(40)
+    for block in blocks:
+        processor.add_block_to_cache(block)
+    totals = (processor.total_txs, processor.total_sompi)
+
+    assert processor.add_block_to_cache(blocks[-1]) is None
+    assert (processor.total_txs, processor.total_sompi) == totals
@@ -0,0 +1,78 @@
+import random
+
+from utils.deflationary_table import DEFLATIONARY_TABLE, END_OF_SCHEDULE
+from utils.emission_schedule import EmissionSchedule, get_schedule
+
+BREAKPOINTS = sorted(DEFLATIONARY_TABLE)
+
+
+def scan_reward(daa_score):
+    """The linear scan get_block_reward used before the bisect lookup."""
+    reward = 0
+    for breakpoint in BREAKPOINTS:
+        reward = DEFLATIONARY_TABLE[breakpoint]
+        if daa_score < breakpoint:
+            break
+    return reward
+
+
+def scan_next_reduction(daa_score):
+    """The linear scan get_next_block_reward_info used, None where it crashed."""
+    for i, breakpoint in enumerate(BREAKPOINTS[:-1]):
+        if daa_score < breakpoint:
+            return breakpoint, DEFLATIONARY_TABLE[BREAKPOINTS[i + 1]]
+    return None
+
+
+def phase_scores():
+    """
+    Every score where the lookups can change, and a point inside each phase.
+
+    Both lookups are step functions of the DAA score, so agreeing on both
+    sides of every breakpoint and once within every phase makes them agree
+    everywhere.
+    """
+    scores = {0, 1}
+    start = 0
+    for breakpoint in BREAKPOINTS[:-1]:
+        scores.update((breakpoint - 1, breakpoint, breakpoint + 1))
+        scores.add((start + breakpoint) // 2)
+        start = breakpoint
+    scores.update((start + 1, start + 10**9, END_OF_SCHEDULE - 1))
+    return sorted(scores)
+
+
+def test_reward_matches_linear_scan():
+    schedule = get_schedule()
+    for daa_score in phase_scores():
+        assert schedule.reward(daa_score) == scan_reward(daa_score), daa_score
+
+
+def test_next_reduction_matches_linear_scan():
+    schedule = get_schedule()
+    for daa_score in phase_scores():
+        expected = scan_next_reduction(daa_score)
+        assert schedule.next_reduction(daa_score) == expected, daa_score
+
+
+def test_random_scores_match_linear_scan():
+    schedule = get_schedule()
+    rng = random.Random(21)
+    scores = sorted(rng.randrange(0, BREAKPOINTS[-2] + 10**8) for _ in range(5000))
+    assert schedule.rewards_at(scores) == [scan_reward(s) for s in scores]
+
+
+def test_table_schedule_matches_generated_one():
+    generated, from_table = get_schedule(), EmissionSchedule(DEFLATIONARY_TABLE)
+    assert list(generated.breakpoints) == list(from_table.breakpoints)
+    assert list(generated.rewards) == list(from_table.rewards)
+    assert list(generated.cumulative) == list(from_table.cumulative)
+
+
+def test_daa_score_at_inverts_emitted():
+    schedule = get_schedule()
+    for daa_score in phase_scores()[:-1]:
+        emitted = schedule.emitted(daa_score)
+        found = schedule.daa_score_at(emitted)
+        assert schedule.emitted(found) >= emitted
+        assert found == 0 or schedule.emitted(found - 1) < emitted
@@ -0,0 +1,51 @@
+import hashlib
+import struct
+
+from utils.deflationary_table import (
+    DEFLATIONARY_TABLE,
+    END_OF_SCHEDULE,
+    SOMPI_PER_SPR,
+    generate_schedule,
+)
+
+# pinned from the literal {DAA score: SPR} table the formula replaced: sha256
+# of its keys as little-endian int64 followed by its values as float64
+TABLE_SHA256 = "622c57a453df6c496114a4aab07c7f0a5501d71aaac8da67ada34d114592fc5b"
+TABLE_LENGTH = 728
+SPOT_REWARDS = {  # DAA score -> sompi, at the phase edges
+    604800: 1500000000,  # pre-deflationary phase
+    3234600: 1200000000,  # first deflationary month
+    63720000: 625000000,  # last month before the first halving
+    66349800: 600000000,  # first month after it
+    126835200: 312500000,  # second halving
+    1909839600: 1,  # last non-zero reward
+    END_OF_SCHEDULE: 0,
+}
+
+
+def table_digest(keys, values):
+    n = len(keys)
+    packed = struct.pack(f"<{n}q", *keys) + struct.pack(f"<{n}d", *values)
+    return hashlib.sha256(packed).hexdigest()
+
+
+def test_generated_schedule_matches_pinned_table():
+    breakpoints, rewards = generate_schedule()
+    assert len(breakpoints) == TABLE_LENGTH
+    assert (
+        table_digest(breakpoints, [r / SOMPI_PER_SPR for r in rewards]) == TABLE_SHA256
+    )
+
+
+def test_deflationary_table_is_bit_for_bit_the_old_literal():
+    assert list(DEFLATIONARY_TABLE) == sorted(DEFLATIONARY_TABLE)
+    assert (
+        table_digest(list(DEFLATIONARY_TABLE), list(DEFLATIONARY_TABLE.values()))
+        == TABLE_SHA256
+    )
+
+
+def test_spot_rewards_at_phase_edges():
+    schedule = dict(zip(*generate_schedule()))
+    for daa_score, reward in SPOT_REWARDS.items():
+        assert schedule[daa_score] == reward, daa_score
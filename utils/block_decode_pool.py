@@ -0,0 +1,92 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from spectred.rpc_pb2 import RpcBlock
+from utils.block_decoder import decode_block, decode_transactions
+
+
+load_dotenv()
+DECODE_EXECUTOR = os.getenv("DECODE_EXECUTOR", "none")  # none / thread / process
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", 2))
+DECODE_BATCH = 32  # blocks handed to a worker at once
+OFFLOAD_MIN_TXS = 500  # smaller batches are cheaper to decode inline
+
+
+def decode_blocks(blocks, keep_transactions=False):
+    """[(BlockRecord, transactions or None), ...] for RpcBlock protobufs."""
+    return [
+        (decode_block(b), decode_transactions(b) if keep_transactions else None)
+        for b in blocks
+    ]
+
+
+def decode_serialized_blocks(payloads, keep_transactions=False):
+    """decode_blocks for serialized RpcBlocks, runs in a worker process."""
+    return decode_blocks(map(RpcBlock.FromString, payloads), keep_transactions)
+
+
+class BlockDecoder:
+    """
+    Decodes blocks on the event loop or in a thread/process pool.
+
+    Workers only turn blocks into BlockRecords, so the event loop is left
+    with appending small records to BlockProcessor. A process pool gets the
+    blocks serialized since protobuf messages do not pickle cheaply; a thread
+    pool shares them but still holds the GIL while decoding, it only lets
+    the loop run in between.
+    """
+
+    def __init__(
+        self,
+        executor=DECODE_EXECUTOR,
+        workers=DECODE_WORKERS,
+        batch_size=DECODE_BATCH,
+        min_txs=OFFLOAD_MIN_TXS,
+    ):
+        if executor == "thread":
+            self.__pool = ThreadPoolExecutor(workers, thread_name_prefix="decode")
+        elif executor == "process":
+            # gRPC threads do not survive a fork
+            self.__pool = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        elif executor == "none":
+            self.__pool = None
+        else:
+            raise ValueError(f"Unknown decode executor: {executor}")
+        self.executor = executor
+        self.batch_size = batch_size
+        self.min_txs = min_txs
+
+    async def decode(self, blocks, keep_transactions=False):
+        """decode_blocks, offloaded in batches once the blocks are big enough."""
+        blocks = list(blocks)
+        if self.__pool is None or (
+            sum(len(b.transactions) for b in blocks) < self.min_txs
+        ):
+            return decode_blocks(blocks, keep_transactions)
+
+        loop = asyncio.get_running_loop()
+        batches = []
+        for i in range(0, len(blocks), self.batch_size):
+            batch = blocks[i : i + self.batch_size]
+            if self.executor == "process":
+                func = decode_serialized_blocks
+                batch = [b.SerializeToString() for b in batch]
+                await asyncio.sleep(0)  # let the loop run between batches
+            else:
+                func = decode_blocks
+            batches.append(
+                loop.run_in_executor(self.__pool, func, batch, keep_transactions)
+            )
+        return [
+            decoded for batch in await asyncio.gather(*batches) for decoded in batch
+        ]
+
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.shutdown(cancel_futures=True)
@@ -0,0 +1,71 @@
+from typing import NamedTuple
+
+
+class BlockRecord(NamedTuple):
+    block_hash: str
+    difficulty: float
+    blue_score: int
+    timestamp: int  # milliseconds
+    tx_count: int
+    output_sompi: int  # sum of all transaction output amounts
+
+
+def decode_block(block) -> BlockRecord:
+    """Reads the fields BlockProcessor needs straight from an RpcBlock protobuf."""
+    transactions = block.transactions
+    return BlockRecord(
+        block.verboseData.hash,
+        block.verboseData.difficulty,
+        block.header.blueScore,
+        block.header.timestamp,
+        len(transactions),
+        sum(output.amount for tx in transactions for output in tx.outputs),
+    )
+
+
+def decode_block_dict(block_info) -> BlockRecord:
+    """Same as decode_block, for a block already converted with MessageToDict."""
+    transactions = block_info.get("transactions", [])
+    return BlockRecord(
+        block_info["verboseData"]["hash"],
+        block_info["verboseData"]["difficulty"],
+        int(block_info["header"]["blueScore"]),
+        int(block_info["header"]["timestamp"]),
+        len(transactions),
+        sum(
+            int(output.get("amount", 0))
+            for tx in transactions
+            for output in tx.get("outputs", [])
+        ),
+    )
+
+
+def decode_transactions(block):
+    """Full (tx id, [(address, amount), ...]) detail of an RpcBlock protobuf."""
+    return [
+        (
+            tx.verboseData.transactionId,
+            [
+                (output.verboseData.scriptPublicKeyAddress, output.amount)
+                for output in tx.outputs
+            ],
+        )
+        for tx in block.transactions
+    ]
+
+
+def decode_transactions_dict(block_info):
+    """Same as decode_transactions, for a block converted with MessageToDict."""
+    return [
+        (
+            tx["verboseData"]["transactionId"],
+            [
+                (
+                    output["verboseData"]["scriptPublicKeyAddress"],
+                    int(output.get("amount", 0)),
+                )
+                for output in tx.get("outputs", [])
+            ],
+        )
+        for tx in block_info.get("transactions", [])
+    ]
@@ -0,0 +1,79 @@
+import bisect
+from collections import OrderedDict
+
+LAG_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)  # seconds, upper bounds
+
+
+class RecentBlockHashes:
+    """
+    Bounded LRU set of recently seen block hashes with their first arrival time.
+
+    When full, the least recently seen hash is forgotten, so memory stays at
+    `capacity` entries however long the bot runs.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.__seen = OrderedDict()
+
+    def __len__(self):
+        return len(self.__seen)
+
+    def __contains__(self, block_hash):
+        return block_hash in self.__seen
+
+    def first_seen(self, block_hash):
+        """Arrival time of the first copy, or None for an unseen hash."""
+        arrived = self.__seen.get(block_hash)
+        if arrived is not None:
+            self.__seen.move_to_end(block_hash)
+        return arrived
+
+    def add(self, block_hash, arrived) -> bool:
+        """Remembers a hash, returns False if it was already known."""
+        if block_hash in self.__seen:
+            self.__seen.move_to_end(block_hash)
+            return False
+        self.__seen[block_hash] = arrived
+        if len(self.__seen) > self.capacity:
+            self.__seen.popitem(last=False)
+        return True
+
+    def discard(self, block_hash):
+        self.__seen.pop(block_hash, None)
+
+
+class LagHistogram:
+    """Counts how far behind the first arrival a node delivers each block."""
+
+    def __init__(self, bounds=LAG_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is "slower than all"
+        self.first = 0  # blocks this node delivered before any other
+        self.total = 0
+
+    def add(self, lag):
+        if lag <= 0:
+            self.first += 1
+        self.counts[bisect.bisect_left(self.bounds, lag)] += 1
+        self.total += 1
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th fraction, inf if beyond."""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def __str__(self):
+        if not self.total:
+            return "no blocks"
+        return (
+            f"{self.total} blocks, first {self.first / self.total:.0%}, "
+            f"p50 <= {self.percentile(0.5)}s, p95 <= {self.percentile(0.95)}s"
+        )
@@ -0,0 +1,79 @@
+from array import array
+
+from utils.block_decoder import BlockRecord
+
+HASH_SIZE = 32  # bytes
+
+
+class BlockRecordStore:
+    """
+    Fixed-capacity ring buffer of BlockRecords kept in parallel typed arrays.
+
+    A cached block costs a fixed ~68 bytes (raw 32-byte hash plus one slot in
+    each numeric column) instead of a tuple with its own objects, so the
+    window can hold 10k+ blocks cheaply. Records are rebuilt on access.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.__hashes = bytearray(HASH_SIZE * capacity)
+        self.__difficulty = array("d", bytes(8 * capacity))
+        self.__blue_score = array("Q", bytes(8 * capacity))
+        self.__timestamp = array("q", bytes(8 * capacity))
+        self.__tx_count = array("I", [0]) * capacity
+        self.__output_sompi = array("Q", bytes(8 * capacity))
+        self.__start = 0
+        self.__len = 0
+
+    @property
+    def maxlen(self):
+        return self.capacity
+
+    def __len__(self):
+        return self.__len
+
+    def __record(self, slot):
+        offset = slot * HASH_SIZE
+        return BlockRecord(
+            self.__hashes[offset : offset + HASH_SIZE].hex(),
+            self.__difficulty[slot],
+            self.__blue_score[slot],
+            self.__timestamp[slot],
+            self.__tx_count[slot],
+            self.__output_sompi[slot],
+        )
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.__len
+        if not 0 <= i < self.__len:
+            raise IndexError("block store index out of range")
+        return self.__record((self.__start + i) % self.capacity)
+
+    def __iter__(self):
+        for i in range(self.__len):
+            yield self.__record((self.__start + i) % self.capacity)
+
+    def append(self, record: BlockRecord):
+        """Stores a record, returns the evicted oldest one once the store is full."""
+        block_hash = bytes.fromhex(record.block_hash)
+        if len(block_hash) != HASH_SIZE:
+            raise ValueError(f"Unexpected block hash length: {record.block_hash}")
+
+        evicted = None
+        if self.__len == self.capacity:
+            evicted = self.__record(self.__start)
+            slot = self.__start
+            self.__start = (self.__start + 1) % self.capacity
+        else:
+            slot = (self.__start + self.__len) % self.capacity
+            self.__len += 1
+
+        offset = slot * HASH_SIZE
+        self.__hashes[offset : offset + HASH_SIZE] = block_hash
+        self.__difficulty[slot] = record.difficulty
+        self.__blue_score[slot] = record.blue_score
+        self.__timestamp[slot] = record.timestamp
+        self.__tx_count[slot] = record.tx_count
+        self.__output_sompi[slot] = record.output_sompi
+        return evicted
@@ -1,730 +1,45 @@
-DEFLATIONARY_TABLE = {
-    604800: 15.0,
-    3234600: 12.0,
-    5864400: 11.75,
-    8494200: 11.5,
-    11124000: 11.25,
-    13753800: 11.0,
-    16383600: 10.75,
-    19013400: 10.5,
-    21643200: 10.25,
-    24273000: 10.0,
-    26902800: 9.75,
-    29532600: 9.5,
-    32162400: 9.25,
-    34792200: 9.0,
-    37422000: 8.75,
-    40051800: 8.5,
-    42681600: 8.25,
-    45311400: 8.0,
-    47941200: 7.75,
-    50571000: 7.5,
-    53200800: 7.25,
-    55830600: 7.0,
-    58460400: 6.75,
-    61090200: 6.5,
-    63720000: 6.25,
-    66349800: 6.0,
-    68979600: 5.875,
-    71609400: 5.75,
-    74239200: 5.625,
-    76869000: 5.5,
-    79498800: 5.375,
-    82128600: 5.25,
-    84758400: 5.125,
-    87388200: 5.0,
-    90018000: 4.875,
-    92647800: 4.75,
-    95277600: 4.625,
-    97907400: 4.5,
-    100537200: 4.375,
-    103167000: 4.25,
-    105796800: 4.125,
-    108426600: 4.0,
-    111056400: 3.875,
-    113686200: 3.75,
-    116316000: 3.625,
-    118945800: 3.5,
-    121575600: 3.375,
-    124205400: 3.25,
-    126835200: 3.125,
-    129465000: 3.0,
-    132094800: 2.9375,
-    134724600: 2.875,
-    137354400: 2.8125,
-    139984200: 2.75,
-    142614000: 2.6875,
-    145243800: 2.625,
-    147873600: 2.5625,
-    150503400: 2.5,
-    153133200: 2.4375,
-    155763000: 2.375,
-    158392800: 2.3125,
-    161022600: 2.25,
-    163652400: 2.1875,
-    166282200: 2.125,
-    168912000: 2.0625,
-    171541800: 2.0,
-    174171600: 1.9375,
-    176801400: 1.875,
-    179431200: 1.8125,
-    182061000: 1.75,
-    184690800: 1.6875,
-    187320600: 1.625,
-    189950400: 1.5625,
-    192580200: 1.5,
-    195210000: 1.46875,
-    197839800: 1.4375,
-    200469600: 1.40625,
-    203099400: 1.375,
-    205729200: 1.34375,
-    208359000: 1.3125,
-    210988800: 1.28125,
-    213618600: 1.25,
-    216248400: 1.21875,
-    218878200: 1.1875,
-    221508000: 1.15625,
-    224137800: 1.125,
-    226767600: 1.09375,
-    229397400: 1.0625,
-    232027200: 1.03125,
-    234657000: 1.0,
-    237286800: 0.96875,
-    239916600: 0.9375,
-    242546400: 0.90625,
-    245176200: 0.875,
-    247806000: 0.84375,
-    250435800: 0.8125,
-    253065600: 0.78125,
-    255695400: 0.75,
-    258325200: 0.734375,
-    260955000: 0.71875,
-    263584800: 0.703125,
-    266214600: 0.6875,
-    268844400: 0.671875,
-    271474200: 0.65625,
-    274104000: 0.640625,
-    276733800: 0.625,
-    279363600: 0.609375,
-    281993400: 0.59375,
-    284623200: 0.578125,
-    287253000: 0.5625,
-    289882800: 0.546875,
-    292512600: 0.53125,
-    295142400: 0.515625,
-    297772200: 0.5,
-    300402000: 0.484375,
-    303031800: 0.46875,
-    305661600: 0.453125,
-    308291400: 0.4375,
-    310921200: 0.421875,
-    313551000: 0.40625,
-    316180800: 0.390625,
-    318810600: 0.375,
-    321440400: 0.3671875,
-    324070200: 0.359375,
-    326700000: 0.3515625,
-    329329800: 0.34375,
-    331959600: 0.3359375,
-    334589400: 0.328125,
-    337219200: 0.3203125,
-    339849000: 0.3125,
-    342478800: 0.3046875,
-    345108600: 0.296875,
-    347738400: 0.2890625,
-    350368200: 0.28125,
-    352998000: 0.2734375,
-    355627800: 0.265625,
-    358257600: 0.2578125,
-    360887400: 0.25,
-    363517200: 0.2421875,
-    366147000: 0.234375,
-    368776800: 0.2265625,
-    371406600: 0.21875,
-    374036400: 0.2109375,
-    376666200: 0.203125,
-    379296000: 0.1953125,
-    381925800: 0.1875,
-    384555600: 0.18359375,
-    387185400: 0.1796875,
-    389815200: 0.17578125,
-    392445000: 0.171875,
-    395074800: 0.16796875,
-    397704600: 0.1640625,
-    400334400: 0.16015625,
-    402964200: 0.15625,
-    405594000: 0.15234375,
-    408223800: 0.1484375,
-    410853600: 0.14453125,
-    413483400: 0.140625,
-    416113200: 0.13671875,
-    418743000: 0.1328125,
-    421372800: 0.12890625,
-    424002600: 0.125,
-    426632400: 0.12109375,
-    429262200: 0.1171875,
-    431892000: 0.11328125,
-    434521800: 0.109375,
-    437151600: 0.10546875,
-    439781400: 0.1015625,
-    442411200: 0.09765625,
-    445041000: 0.09375,
-    447670800: 0.09179687,
-    450300600: 0.08984375,
-    452930400: 0.08789062,
-    455560200: 0.0859375,
-    458190000: 0.08398437,
-    460819800: 0.08203125,
-    463449600: 0.08007812,
-    466079400: 0.078125,
-    468709200: 0.07617187,
-    471339000: 0.07421875,
-    473968800: 0.07226562,
-    476598600: 0.0703125,
-    479228400: 0.06835937,
-    481858200: 0.06640625,
-    484488000: 0.06445312,
-    487117800: 0.0625,
-    489747600: 0.06054687,
-    492377400: 0.05859375,
-    495007200: 0.05664062,
-    497637000: 0.0546875,
-    500266800: 0.05273437,
-    502896600: 0.05078125,
-    505526400: 0.04882812,
-    508156200: 0.046875,
-    510786000: 0.04589843,
-    513415800: 0.04492187,
-    516045600: 0.04394531,
-    518675400: 0.04296875,
-    521305200: 0.04199218,
-    523935000: 0.04101562,
-    526564800: 0.04003906,
-    529194600: 0.0390625,
-    531824400: 0.03808593,
-    534454200: 0.03710937,
-    537084000: 0.03613281,
-    539713800: 0.03515625,
-    542343600: 0.03417968,
-    544973400: 0.03320312,
-    547603200: 0.03222656,
-    550233000: 0.03125,
-    552862800: 0.03027343,
-    555492600: 0.02929687,
-    558122400: 0.02832031,
-    560752200: 0.02734375,
-    563382000: 0.02636718,
-    566011800: 0.02539062,
-    568641600: 0.02441406,
-    571271400: 0.0234375,
-    573901200: 0.02294921,
-    576531000: 0.02246093,
-    579160800: 0.02197265,
-    581790600: 0.02148437,
-    584420400: 0.02099609,
-    587050200: 0.02050781,
-    589680000: 0.02001953,
-    592309800: 0.01953125,
-    594939600: 0.01904296,
-    597569400: 0.01855468,
-    600199200: 0.0180664,
-    602829000: 0.01757812,
-    605458800: 0.01708984,
-    608088600: 0.01660156,
-    610718400: 0.01611328,
-    613348200: 0.015625,
-    615978000: 0.01513671,
-    618607800: 0.01464843,
-    621237600: 0.01416015,
-    623867400: 0.01367187,
-    626497200: 0.01318359,
-    629127000: 0.01269531,
-    631756800: 0.01220703,
-    634386600: 0.01171875,
-    637016400: 0.0114746,
-    639646200: 0.01123046,
-    642276000: 0.01098632,
-    644905800: 0.01074218,
-    647535600: 0.01049804,
-    650165400: 0.0102539,
-    652795200: 0.01000976,
-    655425000: 0.00976562,
-    658054800: 0.00952148,
-    660684600: 0.00927734,
-    663314400: 0.0090332,
-    665944200: 0.00878906,
-    668574000: 0.00854492,
-    671203800: 0.00830078,
-    673833600: 0.00805664,
-    676463400: 0.0078125,
-    679093200: 0.00756835,
-    681723000: 0.00732421,
-    684352800: 0.00708007,
-    686982600: 0.00683593,
-    689612400: 0.00659179,
-    692242200: 0.00634765,
-    694872000: 0.00610351,
-    697501800: 0.00585937,
-    700131600: 0.0057373,
-    702761400: 0.00561523,
-    705391200: 0.00549316,
-    708021000: 0.00537109,
-    710650800: 0.00524902,
-    713280600: 0.00512695,
-    715910400: 0.00500488,
-    718540200: 0.00488281,
-    721170000: 0.00476074,
-    723799800: 0.00463867,
-    726429600: 0.0045166,
-    729059400: 0.00439453,
-    731689200: 0.00427246,
-    734319000: 0.00415039,
-    736948800: 0.00402832,
-    739578600: 0.00390625,
-    742208400: 0.00378417,
-    744838200: 0.0036621,
-    747468000: 0.00354003,
-    750097800: 0.00341796,
-    752727600: 0.00329589,
-    755357400: 0.00317382,
-    757987200: 0.00305175,
-    760617000: 0.00292968,
-    763246800: 0.00286865,
-    765876600: 0.00280761,
-    768506400: 0.00274658,
-    771136200: 0.00268554,
-    773766000: 0.00262451,
-    776395800: 0.00256347,
-    779025600: 0.00250244,
-    781655400: 0.0024414,
-    784285200: 0.00238037,
-    786915000: 0.00231933,
-    789544800: 0.0022583,
-    792174600: 0.00219726,
-    794804400: 0.00213623,
-    797434200: 0.00207519,
-    800064000: 0.00201416,
-    802693800: 0.00195312,
-    805323600: 0.00189208,
-    807953400: 0.00183105,
-    810583200: 0.00177001,
-    813213000: 0.00170898,
-    815842800: 0.00164794,
-    818472600: 0.00158691,
-    821102400: 0.00152587,
-    823732200: 0.00146484,
-    826362000: 0.00143432,
-    828991800: 0.0014038,
-    831621600: 0.00137329,
-    834251400: 0.00134277,
-    836881200: 0.00131225,
-    839511000: 0.00128173,
-    842140800: 0.00125122,
-    844770600: 0.0012207,
-    847400400: 0.00119018,
-    850030200: 0.00115966,
-    852660000: 0.00112915,
-    855289800: 0.00109863,
-    857919600: 0.00106811,
-    860549400: 0.00103759,
-    863179200: 0.00100708,
-    865809000: 0.00097656,
-    868438800: 0.00094604,
-    871068600: 0.00091552,
-    873698400: 0.000885,
-    876328200: 0.00085449,
-    878958000: 0.00082397,
-    881587800: 0.00079345,
-    884217600: 0.00076293,
-    886847400: 0.00073242,
-    889477200: 0.00071716,
-    892107000: 0.0007019,
-    894736800: 0.00068664,
-    897366600: 0.00067138,
-    899996400: 0.00065612,
-    902626200: 0.00064086,
-    905256000: 0.00062561,
-    907885800: 0.00061035,
-    910515600: 0.00059509,
-    913145400: 0.00057983,
-    915775200: 0.00056457,
-    918405000: 0.00054931,
-    921034800: 0.00053405,
-    923664600: 0.00051879,
-    926294400: 0.00050354,
-    928924200: 0.00048828,
-    931554000: 0.00047302,
-    934183800: 0.00045776,
-    936813600: 0.0004425,
-    939443400: 0.00042724,
-    942073200: 0.00041198,
-    944703000: 0.00039672,
-    947332800: 0.00038146,
-    949962600: 0.00036621,
-    952592400: 0.00035858,
-    955222200: 0.00035095,
-    957852000: 0.00034332,
-    960481800: 0.00033569,
-    963111600: 0.00032806,
-    965741400: 0.00032043,
-    968371200: 0.0003128,
-    971001000: 0.00030517,
-    973630800: 0.00029754,
-    976260600: 0.00028991,
-    978890400: 0.00028228,
-    981520200: 0.00027465,
-    984150000: 0.00026702,
-    986779800: 0.00025939,
-    989409600: 0.00025177,
-    992039400: 0.00024414,
-    994669200: 0.00023651,
-    997299000: 0.00022888,
-    999928800: 0.00022125,
-    1002558600: 0.00021362,
-    1005188400: 0.00020599,
-    1007818200: 0.00019836,
-    1010448000: 0.00019073,
-    1013077800: 0.0001831,
-    1015707600: 0.00017929,
-    1018337400: 0.00017547,
-    1020967200: 0.00017166,
-    1023597000: 0.00016784,
-    1026226800: 0.00016403,
-    1028856600: 0.00016021,
-    1031486400: 0.0001564,
-    1034116200: 0.00015258,
-    1036746000: 0.00014877,
-    1039375800: 0.00014495,
-    1042005600: 0.00014114,
-    1044635400: 0.00013732,
-    1047265200: 0.00013351,
-    1049895000: 0.00012969,
-    1052524800: 0.00012588,
-    1055154600: 0.00012207,
-    1057784400: 0.00011825,
-    1060414200: 0.00011444,
-    1063044000: 0.00011062,
-    1065673800: 0.00010681,
-    1068303600: 0.00010299,
-    1070933400: 9.918e-05,
-    1073563200: 9.536e-05,
-    1076193000: 9.155e-05,
-    1078822800: 8.964e-05,
-    1081452600: 8.773e-05,
-    1084082400: 8.583e-05,
-    1086712200: 8.392e-05,
-    1089342000: 8.201e-05,
-    1091971800: 8.01e-05,
-    1094601600: 7.82e-05,
-    1097231400: 7.629e-05,
-    1099861200: 7.438e-05,
-    1102491000: 7.247e-05,
-    1105120800: 7.057e-05,
-    1107750600: 6.866e-05,
-    1110380400: 6.675e-05,
-    1113010200: 6.484e-05,
-    1115640000: 6.294e-05,
-    1118269800: 6.103e-05,
-    1120899600: 5.912e-05,
-    1123529400: 5.722e-05,
-    1126159200: 5.531e-05,
-    1128789000: 5.34e-05,
-    1131418800: 5.149e-05,
-    1134048600: 4.959e-05,
-    1136678400: 4.768e-05,
-    1139308200: 4.577e-05,
-    1141938000: 4.482e-05,
-    1144567800: 4.386e-05,
-    1147197600: 4.291e-05,
-    1149827400: 4.196e-05,
-    1152457200: 4.1e-05,
-    1155087000: 4.005e-05,
-    1157716800: 3.91e-05,
-    1160346600: 3.814e-05,
-    1162976400: 3.719e-05,
-    1165606200: 3.623e-05,
-    1168236000: 3.528e-05,
-    1170865800: 3.433e-05,
-    1173495600: 3.337e-05,
-    1176125400: 3.242e-05,
-    1178755200: 3.147e-05,
-    1181385000: 3.051e-05,
-    1184014800: 2.956e-05,
-    1186644600: 2.861e-05,
-    1189274400: 2.765e-05,
-    1191904200: 2.67e-05,
-    1194534000: 2.574e-05,
-    1197163800: 2.479e-05,
-    1199793600: 2.384e-05,
-    1202423400: 2.288e-05,
-    1205053200: 2.241e-05,
-    1207683000: 2.193e-05,
-    1210312800: 2.145e-05,
-    1212942600: 2.098e-05,
-    1215572400: 2.05e-05,
-    1218202200: 2.002e-05,
-    1220832000: 1.955e-05,
-    1223461800: 1.907e-05,
-    1226091600: 1.859e-05,
-    1228721400: 1.811e-05,
-    1231351200: 1.764e-05,
-    1233981000: 1.716e-05,
-    1236610800: 1.668e-05,
-    1239240600: 1.621e-05,
-    1241870400: 1.573e-05,
-    1244500200: 1.525e-05,
-    1247130000: 1.478e-05,
-    1249759800: 1.43e-05,
-    1252389600: 1.382e-05,
-    1255019400: 1.335e-05,
-    1257649200: 1.287e-05,
-    1260279000: 1.239e-05,
-    1262908800: 1.192e-05,
-    1265538600: 1.144e-05,
-    1268168400: 1.12e-05,
-    1270798200: 1.096e-05,
-    1273428000: 1.072e-05,
-    1276057800: 1.049e-05,
-    1278687600: 1.025e-05,
-    1281317400: 1.001e-05,
-    1283947200: 9.77e-06,
-    1286577000: 9.53e-06,
-    1289206800: 9.29e-06,
-    1291836600: 9.05e-06,
-    1294466400: 8.82e-06,
-    1297096200: 8.58e-06,
-    1299726000: 8.34e-06,
-    1302355800: 8.1e-06,
-    1304985600: 7.86e-06,
-    1307615400: 7.62e-06,
-    1310245200: 7.39e-06,
-    1312875000: 7.15e-06,
-    1315504800: 6.91e-06,
-    1318134600: 6.67e-06,
-    1320764400: 6.43e-06,
-    1323394200: 6.19e-06,
-    1326024000: 5.96e-06,
-    1328653800: 5.72e-06,
-    1331283600: 5.6e-06,
-    1333913400: 5.48e-06,
-    1336543200: 5.36e-06,
-    1339173000: 5.24e-06,
-    1341802800: 5.12e-06,
-    1344432600: 5e-06,
-    1347062400: 4.88e-06,
-    1349692200: 4.76e-06,
-    1352322000: 4.64e-06,
-    1354951800: 4.52e-06,
-    1357581600: 4.41e-06,
-    1360211400: 4.29e-06,
-    1362841200: 4.17e-06,
-    1365471000: 4.05e-06,
-    1368100800: 3.93e-06,
-    1370730600: 3.81e-06,
-    1373360400: 3.69e-06,
-    1375990200: 3.57e-06,
-    1378620000: 3.45e-06,
-    1381249800: 3.33e-06,
-    1383879600: 3.21e-06,
-    1386509400: 3.09e-06,
-    1389139200: 2.98e-06,
-    1391769000: 2.86e-06,
-    1394398800: 2.8e-06,
-    1397028600: 2.74e-06,
-    1399658400: 2.68e-06,
-    1402288200: 2.62e-06,
-    1404918000: 2.56e-06,
-    1407547800: 2.5e-06,
-    1410177600: 2.44e-06,
-    1412807400: 2.38e-06,
-    1415437200: 2.32e-06,
-    1418067000: 2.26e-06,
-    1420696800: 2.2e-06,
-    1423326600: 2.14e-06,
-    1425956400: 2.08e-06,
-    1428586200: 2.02e-06,
-    1431216000: 1.96e-06,
-    1433845800: 1.9e-06,
-    1436475600: 1.84e-06,
-    1439105400: 1.78e-06,
-    1441735200: 1.72e-06,
-    1444365000: 1.66e-06,
-    1446994800: 1.6e-06,
-    1449624600: 1.54e-06,
-    1452254400: 1.49e-06,
-    1454884200: 1.43e-06,
-    1457514000: 1.4e-06,
-    1460143800: 1.37e-06,
-    1462773600: 1.34e-06,
-    1465403400: 1.31e-06,
-    1468033200: 1.28e-06,
-    1470663000: 1.25e-06,
-    1473292800: 1.22e-06,
-    1475922600: 1.19e-06,
-    1478552400: 1.16e-06,
-    1481182200: 1.13e-06,
-    1483812000: 1.1e-06,
-    1486441800: 1.07e-06,
-    1489071600: 1.04e-06,
-    1491701400: 1.01e-06,
-    1494331200: 9.8e-07,
-    1496961000: 9.5e-07,
-    1499590800: 9.2e-07,
-    1502220600: 8.9e-07,
-    1504850400: 8.6e-07,
-    1507480200: 8.3e-07,
-    1510110000: 8e-07,
-    1512739800: 7.7e-07,
-    1515369600: 7.4e-07,
-    1517999400: 7.1e-07,
-    1520629200: 7e-07,
-    1523259000: 6.8e-07,
-    1525888800: 6.7e-07,
-    1528518600: 6.5e-07,
-    1531148400: 6.4e-07,
-    1533778200: 6.2e-07,
-    1536408000: 6.1e-07,
-    1539037800: 5.9e-07,
-    1541667600: 5.8e-07,
-    1544297400: 5.6e-07,
-    1546927200: 5.5e-07,
-    1549557000: 5.3e-07,
-    1552186800: 5.2e-07,
-    1554816600: 5e-07,
-    1557446400: 4.9e-07,
-    1560076200: 4.7e-07,
-    1562706000: 4.6e-07,
-    1565335800: 4.4e-07,
-    1567965600: 4.3e-07,
-    1570595400: 4.1e-07,
-    1573225200: 4e-07,
-    1575855000: 3.8e-07,
-    1578484800: 3.7e-07,
-    1581114600: 3.5e-07,
-    1583744400: 3.5e-07,
-    1586374200: 3.4e-07,
-    1589004000: 3.3e-07,
-    1591633800: 3.2e-07,
-    1594263600: 3.2e-07,
-    1596893400: 3.1e-07,
-    1599523200: 3e-07,
-    1602153000: 2.9e-07,
-    1604782800: 2.9e-07,
-    1607412600: 2.8e-07,
-    1610042400: 2.7e-07,
-    1612672200: 2.6e-07,
-    1615302000: 2.6e-07,
-    1617931800: 2.5e-07,
-    1620561600: 2.4e-07,
-    1623191400: 2.3e-07,
-    1625821200: 2.3e-07,
-    1628451000: 2.2e-07,
-    1631080800: 2.1e-07,
-    1633710600: 2e-07,
-    1636340400: 2e-07,
-    1638970200: 1.9e-07,
-    1641600000: 1.8e-07,
-    1644229800: 1.7e-07,
-    1646859600: 1.7e-07,
-    1649489400: 1.7e-07,
-    1652119200: 1.6e-07,
-    1654749000: 1.6e-07,
-    1657378800: 1.6e-07,
-    1660008600: 1.5e-07,
-    1662638400: 1.5e-07,
-    1665268200: 1.4e-07,
-    1667898000: 1.4e-07,
-    1670527800: 1.4e-07,
-    1673157600: 1.3e-07,
-    1675787400: 1.3e-07,
-    1678417200: 1.3e-07,
-    1681047000: 1.2e-07,
-    1683676800: 1.2e-07,
-    1686306600: 1.1e-07,
-    1688936400: 1.1e-07,
-    1691566200: 1.1e-07,
-    1694196000: 1e-07,
-    1696825800: 1e-07,
-    1699455600: 1e-07,
-    1702085400: 9e-08,
-    1704715200: 9e-08,
-    1707345000: 8e-08,
-    1709974800: 8e-08,
-    1712604600: 8e-08,
-    1715234400: 8e-08,
-    1717864200: 8e-08,
-    1720494000: 8e-08,
-    1723123800: 7e-08,
-    1725753600: 7e-08,
-    1728383400: 7e-08,
-    1731013200: 7e-08,
-    1733643000: 7e-08,
-    1736272800: 6e-08,
-    1738902600: 6e-08,
-    1741532400: 6e-08,
-    1744162200: 6e-08,
-    1746792000: 6e-08,
-    1749421800: 5e-08,
-    1752051600: 5e-08,
-    1754681400: 5e-08,
-    1757311200: 5e-08,
-    1759941000: 5e-08,
-    1762570800: 5e-08,
-    1765200600: 4e-08,
-    1767830400: 4e-08,
-    1770460200: 4e-08,
-    1773090000: 4e-08,
-    1775719800: 4e-08,
-    1778349600: 4e-08,
-    1780979400: 4e-08,
-    1783609200: 4e-08,
-    1786239000: 3e-08,
-    1788868800: 3e-08,
-    1791498600: 3e-08,
-    1794128400: 3e-08,
-    1796758200: 3e-08,
-    1799388000: 3e-08,
-    1802017800: 3e-08,
-    1804647600: 3e-08,
-    1807277400: 3e-08,
-    1809907200: 3e-08,
-    1812537000: 2e-08,
-    1815166800: 2e-08,
-    1817796600: 2e-08,
-    1820426400: 2e-08,
-    1823056200: 2e-08,
-    1825686000: 2e-08,
-    1828315800: 2e-08,
-    1830945600: 2e-08,
-    1833575400: 2e-08,
-    1836205200: 2e-08,
-    1838835000: 2e-08,
-    1841464800: 2e-08,
-    1844094600: 2e-08,
-    1846724400: 2e-08,
-    1849354200: 1e-08,
-    1851984000: 1e-08,
-    1854613800: 1e-08,
-    1857243600: 1e-08,
-    1859873400: 1e-08,
-    1862503200: 1e-08,
-    1865133000: 1e-08,
-    1867762800: 1e-08,
-    1870392600: 1e-08,
-    1873022400: 1e-08,
-    1875652200: 1e-08,
-    1878282000: 1e-08,
-    1880911800: 1e-08,
-    1883541600: 1e-08,
-    1886171400: 1e-08,
-    1888801200: 1e-08,
-    1891431000: 1e-08,
-    1894060800: 1e-08,
-    1896690600: 1e-08,
-    1899320400: 1e-08,
-    1901950200: 1e-08,
-    1904580000: 1e-08,
-    1907209800: 1e-08,
-    1909839600: 1e-08,
-    9223372036854775807: 0.0,
-}
+from array import array
+from functools import lru_cache
+
+# Block reward schedule, keyed by the DAA score at which each reward ends:
+# a pre-deflationary phase, then a reduction every month. Each halving
+# period is split into 24 monthly steps of 1/48 of the period's base reward.
+PRE_DEFLATIONARY_PHASE_END = 604800  # DAA score, one week
+PRE_DEFLATIONARY_REWARD = 1500000000  # sompi
+DEFLATIONARY_PHASE_BASE_REWARD = 1200000000  # sompi
+SECONDS_PER_MONTH = 2629800
+MONTHS_PER_HALVING = 24
+END_OF_SCHEDULE = 9223372036854775807  # sentinel key of the final 0 reward
+SOMPI_PER_SPR = 100000000
+
+
+def deflationary_reward(month):
+    """Reward in sompi during the given month of the deflationary phase."""
+    halvings, step = divmod(month, MONTHS_PER_HALVING)
+    reward = DEFLATIONARY_PHASE_BASE_REWARD * (2 * MONTHS_PER_HALVING - step)
+    return reward // (2 * MONTHS_PER_HALVING) >> halvings
+
+
+@lru_cache(maxsize=None)
+def generate_schedule():
+    """(breakpoints, rewards in sompi) as arrays, built on first use."""
+    breakpoints = array("q", [PRE_DEFLATIONARY_PHASE_END])
+    rewards = array("q", [PRE_DEFLATIONARY_REWARD])
+    month = 0
+    while (reward := deflationary_reward(month)) > 0:
+        month += 1
+        breakpoints.append(PRE_DEFLATIONARY_PHASE_END + SECONDS_PER_MONTH * month)
+        rewards.append(reward)
+    breakpoints.append(END_OF_SCHEDULE)
+    rewards.append(0)
+    return breakpoints, rewards
+
+
+def __getattr__(name):
+    # DEFLATIONARY_TABLE used to be a literal dict of {DAA score: SPR reward}
+    if name == "DEFLATIONARY_TABLE":
+        breakpoints, rewards = generate_schedule()
+        table = {k: r / SOMPI_PER_SPR for k, r in zip(breakpoints, rewards)}
+        globals()[name] = table
+        return table
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,92 @@
+import bisect
+from array import array
+from functools import lru_cache
+
+from utils.deflationary_table import SOMPI_PER_SPR, generate_schedule
+
+DAA_SCORES_PER_SECOND = 1  # the DAA score advances once per targeted block
+
+
+class EmissionSchedule:
+    """
+    Block reward phases as sorted breakpoint and reward arrays.
+
+    Each breakpoint is the DAA score at which its reward phase ends, so the
+    phase of a DAA score is the first breakpoint above it, found by bisect
+    instead of scanning the table. Prefix sums of the sompi emitted by the
+    end of each phase make emission totals and their inverse O(log n) too.
+    """
+
+    def __init__(self, table=None):
+        """Uses the generated chain schedule unless given a {DAA score: SPR} table."""
+        if table is None:
+            self.breakpoints, self.rewards_sompi = generate_schedule()
+            self.rewards = array("d", (r / SOMPI_PER_SPR for r in self.rewards_sompi))
+        else:
+            breakpoints = sorted(table)
+            self.breakpoints = array("q", breakpoints)
+            self.rewards = array("d", (table[k] for k in breakpoints))
+            self.rewards_sompi = array(
+                "q", (round(r * SOMPI_PER_SPR) for r in self.rewards)
+            )
+        # sompi emitted from DAA score 0 up to each breakpoint
+        self.cumulative = array("q")
+        total, start = 0, 0
+        for breakpoint, reward in zip(self.breakpoints, self.rewards_sompi):
+            total += (breakpoint - start) * reward
+            self.cumulative.append(total)
+            start = breakpoint
+
+    def __len__(self):
+        return len(self.breakpoints)
+
+    def phase(self, daa_score) -> int:
+        return bisect.bisect_right(self.breakpoints, daa_score)
+
+    def reward(self, daa_score) -> float:
+        """Block reward in SPR at a DAA score."""
+        return self.rewards[min(self.phase(daa_score), len(self.rewards) - 1)]
+
+    def next_reduction(self, daa_score):
+        """(DAA score, reward) of the next reduction, None after the last one."""
+        i = self.phase(daa_score)
+        if i + 1 >= len(self.rewards):
+            return None
+        return self.breakpoints[i], self.rewards[i + 1]
+
+    def emitted(self, daa_score) -> int:
+        """Sompi emitted by blocks from DAA score 0 up to, not including, daa_score."""
+        daa_score = max(daa_score, 0)
+        i = self.phase(daa_score)
+        if i >= len(self.breakpoints):
+            return self.cumulative[-1]
+        start = self.breakpoints[i - 1] if i else 0
+        base = self.cumulative[i - 1] if i else 0
+        return base + (daa_score - start) * self.rewards_sompi[i]
+
+    def emitted_between(self, start, end) -> int:
+        """Sompi emitted by blocks with start <= DAA score < end."""
+        return self.emitted(end) - self.emitted(start)
+
+    def daa_score_at(self, emitted_sompi):
+        """First DAA score by which emitted_sompi have been emitted, None if never."""
+        if emitted_sompi <= 0:
+            return 0
+        i = bisect.bisect_left(self.cumulative, emitted_sompi)
+        if i >= len(self.cumulative):
+            return None
+        start = self.breakpoints[i - 1] if i else 0
+        base = self.cumulative[i - 1] if i else 0
+        return start + -(-(emitted_sompi - base) // self.rewards_sompi[i])
+
+    def rewards_at(self, daa_scores):
+        """reward() for many DAA scores at once."""
+        breakpoints, rewards, last = self.breakpoints, self.rewards, len(self) - 1
+        bisect_right = bisect.bisect_right
+        return [rewards[min(bisect_right(breakpoints, s), last)] for s in daa_scores]
+
+
+@lru_cache(maxsize=None)
+def get_schedule() -> EmissionSchedule:
+    """The chain's emission schedule, built on first use."""
+    return EmissionSchedule()
@@ -1,21 +1,44 @@
 import os
 from dotenv import load_dotenv
+import asyncio
+import logging
 import time
 from datetime import datetime
 
 from spectred.SpectredMultiClient import SpectredMultiClient
-from utils.deflationary_table import DEFLATIONARY_TABLE
+from utils.emission_schedule import get_schedule
 from utils.sompi_to_spr import sompis_to_spr
 
 
 load_dotenv()
 SPECTRED_HOSTS = os.getenv("SPECTRED_HOSTS").split(",")
+NETWORK_INFO_MAX_AGE = int(os.getenv("NETWORK_INFO_MAX_AGE", 60))  # seconds
+NETWORK_STATE_MAX_AGE = 30  # seconds without a DAA score notification before polling
+RESUBSCRIBE_BACKOFF_MIN = 1  # seconds
+RESUBSCRIBE_BACKOFF_MAX = 60  # seconds
 
 network_info = {}
+network_info_updated = None  # monotonic time of the last successful refresh
+network_state_updated = None  # monotonic time of the last DAA score notification
+difficulty_block_time = (
+    None  # timestamp in seconds of the block the difficulty came from
+)
 
+_client = None
+_refresh_task = None
 
-async def get_coin_supply(client):
-    resp = await client.request("getCoinSupplyRequest", {})
+
+async def get_client():
+    """Returns the SpectredMultiClient shared by all network info refreshes."""
+    global _client
+    if _client is None:
+        _client = SpectredMultiClient(SPECTRED_HOSTS, multiplex=True, hedge=True)
+        await _client.initialize_any()
+        _client.start_health_probe()
+    return _client
+
+
+def parse_coin_supply(resp):
     circulating_sompi = int(resp["getCoinSupplyResponse"]["circulatingSompi"])
     max_sompi = int(resp["getCoinSupplyResponse"]["maxSompi"])
     return {
@@ -25,24 +48,16 @@ async def get_coin_supply(client):
 
 
 async def get_block_reward(daa_score):
-    reward = 0
-    for to_break_score in sorted(DEFLATIONARY_TABLE):
-        reward = DEFLATIONARY_TABLE[to_break_score]
-        if daa_score < to_break_score:
-            break
-    return reward
+    return get_schedule().reward(daa_score)
 
 
 async def get_next_block_reward_info(daa_score):
-    future_reward = 0
-    daa_breakpoint = 0
-    daa_list = sorted(DEFLATIONARY_TABLE)
-
-    for i, to_break_score in enumerate(daa_list):
-        if daa_score < to_break_score:
-            future_reward = DEFLATIONARY_TABLE[daa_list[i + 1]]
-            daa_breakpoint = to_break_score
-            break
+    next_reduction = get_schedule().next_reduction(daa_score)
+    if next_reduction is None:
+        # past the final reduction the reward stays where it is
+        daa_breakpoint, future_reward = daa_score, get_schedule().reward(daa_score)
+    else:
+        daa_breakpoint, future_reward = next_reduction
 
     next_halving_timestamp = int(time.time() + (daa_breakpoint - daa_score))
     next_halving_date = datetime.utcfromtimestamp(next_halving_timestamp).strftime(
@@ -53,26 +68,53 @@ async def get_next_block_reward_info(daa_score):
     return future_reward, next_halving_timestamp, next_halving_date, days_until_halving
 
 
+async def apply_daa_score(daa_score):
+    """Updates the DAA score and the reward info derived from it."""
+    block_reward = await get_block_reward(daa_score)
+    (
+        future_reward,
+        next_halving_timestamp,
+        next_halving_date,
+        days_until_halving,
+    ) = await get_next_block_reward_info(daa_score)
+
+    network_info.update(
+        {
+            "Block Reward": f"{block_reward:.2f} -> {future_reward:.2f} in {days_until_halving:.1f} days",
+            "Next Halving Date": f"{next_halving_date} (Timestamp: {next_halving_timestamp})",
+            "virtualDaaScore": daa_score,
+        }
+    )
+
+
+def apply_difficulty(difficulty, block_time):
+    """Takes the difficulty from a received block instead of polling for it."""
+    global difficulty_block_time
+    if difficulty_block_time is not None and block_time < difficulty_block_time:
+        return  # a backfilled block older than the one already applied
+    network_info["Difficulty"] = difficulty
+    difficulty_block_time = block_time
+
+
 async def update_network_info():
-    global network_info
+    global network_info_updated
 
-    client = SpectredMultiClient(SPECTRED_HOSTS)
-    await client.initialize_all()
+    client = await get_client()
+
+    dag_info_resp, coin_supply_resp = await client.request_many(
+        [("getBlockDagInfoRequest", {}), ("getCoinSupplyRequest", {})]
+    )
+    for resp in (dag_info_resp, coin_supply_resp):
+        if isinstance(resp, Exception):
+            raise resp
 
-    dag_info_resp = await client.request("getBlockDagInfoRequest", {})
     dag_info = dag_info_resp["getBlockDagInfoResponse"]
     network_name = dag_info["networkName"]
     difficulty = dag_info["difficulty"]
     daa_score = int(dag_info["virtualDaaScore"])
 
-    coin_supply = await get_coin_supply(client)
-    block_reward = await get_block_reward(daa_score)
-    (
-        future_reward,
-        next_halving_timestamp,
-        next_halving_date,
-        days_until_halving,
-    ) = await get_next_block_reward_info(daa_score)
+    coin_supply = parse_coin_supply(coin_supply_resp)
+    await apply_daa_score(daa_score)
 
     network_info.update(
         {
@@ -80,8 +122,103 @@ async def update_network_info():
             "Max Supply": coin_supply["maxSupply"],
             "Circulating Supply": coin_supply["circulatingSupply"],
             "Difficulty": difficulty,
-            "Block Reward": f"{block_reward:.2f} -> {future_reward:.2f} in {days_until_halving:.1f} days",
-            "Next Halving Date": f"{next_halving_date} (Timestamp: {next_halving_timestamp})",
-            "virtualDaaScore": daa_score,
         }
     )
+    network_info_updated = time.monotonic()
+
+
+async def update_coin_supply():
+    """Reconciles the supply, the one figure no notification carries."""
+    global network_info_updated
+
+    client = await get_client()
+    coin_supply = parse_coin_supply(await client.request("getCoinSupplyRequest", {}))
+    network_info.update(
+        {
+            "Max Supply": coin_supply["maxSupply"],
+            "Circulating Supply": coin_supply["circulatingSupply"],
+        }
+    )
+    network_info_updated = time.monotonic()
+
+
+def network_state_live():
+    """True while DAA score notifications keep network_info current."""
+    return (
+        network_state_updated is not None
+        and time.monotonic() - network_state_updated < NETWORK_STATE_MAX_AGE
+        and "Network Name" in network_info
+    )
+
+
+def difficulty_live():
+    """True while received blocks keep the difficulty current."""
+    return (
+        difficulty_block_time is not None
+        and time.time() - difficulty_block_time < NETWORK_STATE_MAX_AGE
+    )
+
+
+async def _on_network_event(event):
+    global network_state_updated
+
+    if event.WhichOneof("payload") == "virtualDaaScoreChangedNotification":
+        await apply_daa_score(event.virtualDaaScoreChangedNotification.virtualDaaScore)
+        network_state_updated = time.monotonic()
+
+
+async def _subscribe(command):
+    backoff = RESUBSCRIBE_BACKOFF_MIN
+    while True:
+        started = time.monotonic()
+        try:
+            client = await get_client()
+            await client.notify(command, None, _on_network_event, raw=True)
+            logging.warning(f"{command} subscription ended by node.")
+        except Exception as e:
+            logging.warning(f"{command} subscription lost: {e}")
+        if time.monotonic() - started > RESUBSCRIBE_BACKOFF_MAX:
+            backoff = RESUBSCRIBE_BACKOFF_MIN  # it was up for a while
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, RESUBSCRIBE_BACKOFF_MAX)
+
+
+async def subscribe_network_state():
+    """Keeps the DAA score and the reward info in network_info current."""
+    await _subscribe("notifyVirtualDaaScoreChangedRequest")
+
+
+def _log_refresh_error(task):
+    if not task.cancelled() and task.exception() is not None:
+        logging.error(f"Error refreshing network info: {task.exception()}")
+
+
+def _start_refresh():
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        # only the supply needs polling while notifications and blocks flow,
+        # virtual_chain mode receives no blocks to take the difficulty from
+        live = network_state_live() and difficulty_live()
+        update = update_coin_supply if live else update_network_info
+        _refresh_task = asyncio.create_task(update())
+        _refresh_task.add_done_callback(_log_refresh_error)
+    return _refresh_task
+
+
+async def refresh_network_info():
+    """Refreshes network_info, joining the refresh already in flight if any."""
+    await asyncio.shield(_start_refresh())
+
+
+async def get_network_info(max_age=NETWORK_INFO_MAX_AGE):
+    """
+    Returns the shared network_info snapshot.
+
+    A snapshot older than max_age is returned as is while a single refresh
+    runs in the background; only an empty snapshot waits for the node.
+    """
+    if network_info_updated is None:
+        await refresh_network_info()
+    elif time.monotonic() - network_info_updated > max_age:
+        _start_refresh()
+    return network_info
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+
+
+load_dotenv()
+# block: wait for room, drop_oldest: drop the oldest when full
+POLICIES = ("block", "drop_oldest")
+QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 10000))
+QUEUE_POLICY = os.getenv("INGEST_QUEUE_POLICY", "drop_oldest")
+BATCH_MAX_ITEMS = 64  # items handed to the consumer at once
+BATCH_MAX_WAIT = 0.05  # seconds to wait for a batch to fill up
+LAG_ALPHA = 0.1  # weight of the newest sample in the lag average
+
+
+class IngestionQueue:
+    """
+    Bounded queue between a notification stream and its consumer.
+
+    The stream callback only enqueues, so a slow consumer no longer stalls
+    the gRPC read loop. What happens when the queue is full is an explicit
+    policy, and every dropped or blocked put is counted.
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE, policy=QUEUE_POLICY, on_drop=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.on_drop = on_drop  # called with each item dropped for room
+        self.enqueued = 0
+        self.dropped = 0
+        self.blocked = 0  # puts that had to wait for room
+        self.lag = None  # average seconds from put to get
+        self.__items = deque()  # (item, enqueued at)
+        self.__not_empty = asyncio.Event()
+        self.__not_full = asyncio.Event()
+
+    def __len__(self):
+        return len(self.__items)
+
+    @property
+    def depth(self):
+        return len(self.__items)
+
+    async def put(self, item):
+        if len(self.__items) >= self.maxsize and self.policy == "block":
+            self.blocked += 1
+            while len(self.__items) >= self.maxsize:
+                self.__not_full.clear()
+                await self.__not_full.wait()
+        while len(self.__items) >= self.maxsize:
+            dropped, _ = self.__items.popleft()
+            self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop(dropped)
+
+        self.__items.append((item, time.monotonic()))
+        self.enqueued += 1
+        self.__not_empty.set()
+
+    async def __wait_not_empty(self):
+        while not self.__items:
+            self.__not_empty.clear()
+            await self.__not_empty.wait()
+
+    async def get_batch(self, max_items=BATCH_MAX_ITEMS, max_wait=BATCH_MAX_WAIT):
+        """Waits for an item, then up to `max_wait` for the batch to fill."""
+        await self.__wait_not_empty()
+        deadline = time.monotonic() + max_wait
+        while len(self.__items) < max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self.__not_empty.clear()
+            try:
+                await asyncio.wait_for(self.__not_empty.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        now = time.monotonic()
+        batch = []
+        while self.__items and len(batch) < max_items:
+            item, enqueued = self.__items.popleft()
+            batch.append(item)
+            lag = now - enqueued
+            self.lag = (
+                lag if self.lag is None else self.lag + LAG_ALPHA * (lag - self.lag)
+            )
+        self.__not_full.set()
+        return batch
+
+    def __str__(self):
+        lag = f"{self.lag * 1000:.1f}ms" if self.lag is not None else "n/a"
+        return (
+            f"depth {self.depth}/{self.maxsize}, lag {lag}, enqueued {self.enqueued}, "
+            f"dropped {self.dropped}, blocked {self.blocked}"
+        )
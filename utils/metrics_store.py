@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from utils.block_decoder import BlockRecord
+
+
+load_dotenv()
+METRICS_DB_PATH = os.getenv("METRICS_DB_PATH", "")  # empty disables the store
+
+FLUSH_INTERVAL = 5  # seconds between batched writes
+RETENTION_INTERVAL = 3600  # seconds between downsampling runs
+SECOND_RETENTION = 2 * 86400  # per-second rows older than this become per-minute
+MINUTE_RETENTION = 365 * 86400  # per-minute rows are dropped after this
+SAMPLE_RETENTION = 365 * 86400  # price/difficulty samples are dropped after this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS block_stats (
+    ts INTEGER PRIMARY KEY,
+    blocks INTEGER NOT NULL,
+    txs INTEGER NOT NULL,
+    sompi INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS block_stats_minute (
+    ts INTEGER PRIMARY KEY,
+    blocks INTEGER NOT NULL,
+    txs INTEGER NOT NULL,
+    sompi INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_name_ts ON samples (name, ts);
+"""
+
+UPSERT_STATS = """
+INSERT INTO block_stats (ts, blocks, txs, sompi) VALUES (?, ?, ?, ?)
+ON CONFLICT (ts) DO UPDATE SET
+    blocks = blocks + excluded.blocks,
+    txs = txs + excluded.txs,
+    sompi = sompi + excluded.sompi
+"""
+
+ROLLUP_MINUTES = """
+INSERT INTO block_stats_minute (ts, blocks, txs, sompi)
+SELECT ts / 60 * 60, SUM(blocks), SUM(txs), SUM(sompi)
+FROM block_stats WHERE ts < ? GROUP BY ts / 60
+ON CONFLICT (ts) DO UPDATE SET
+    blocks = blocks + excluded.blocks,
+    txs = txs + excluded.txs,
+    sompi = sompi + excluded.sompi
+"""
+
+_logger = logging.getLogger(__name__)
+
+
+class MetricsStore:
+    """
+    Append-only SQLite history of block aggregates and market samples.
+
+    Blocks are summed per second in memory and samples are queued, so the
+    ingestion path never touches disk. A background task writes the batch
+    every few seconds on a single worker thread that owns the connection,
+    and periodically folds old per-second rows into per-minute ones.
+    """
+
+    def __init__(self, path=METRICS_DB_PATH, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.__executor = ThreadPoolExecutor(1, thread_name_prefix="metrics")
+        self.__db = None
+        self.__pending_stats = {}  # unix second -> [blocks, txs, sompi]
+        self.__pending_samples = []
+        self.__task = None
+
+    async def __run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, func, *args
+        )
+
+    def __connect(self):
+        self.__db = sqlite3.connect(self.path)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.executescript(SCHEMA)
+
+    async def open(self):
+        if self.__db is not None:
+            return
+        await self.__run(self.__connect)
+        _logger.info(f"Metrics store opened at {self.path}")
+
+    def record_block(self, record: BlockRecord):
+        second = record.timestamp // 1000
+        stats = self.__pending_stats.get(second)
+        if stats is None:
+            self.__pending_stats[second] = [1, record.tx_count, record.output_sompi]
+        else:
+            stats[0] += 1
+            stats[1] += record.tx_count
+            stats[2] += record.output_sompi
+
+    def record_sample(self, name, value, ts=None):
+        if value is not None:
+            self.__pending_samples.append(
+                (time.time() if ts is None else ts, name, float(value))
+            )
+
+    def __write(self, stats, samples):
+        with self.__db:
+            self.__db.executemany(
+                UPSERT_STATS,
+                [(ts, *values) for ts, values in stats.items()],
+            )
+            self.__db.executemany(
+                "INSERT INTO samples (ts, name, value) VALUES (?, ?, ?)", samples
+            )
+
+    async def flush(self):
+        if not self.__pending_stats and not self.__pending_samples:
+            return
+        stats, self.__pending_stats = self.__pending_stats, {}
+        samples, self.__pending_samples = self.__pending_samples, []
+        await self.__run(self.__write, stats, samples)
+
+    def __downsample(self, now):
+        cutoff = int(now - SECOND_RETENTION) // 60 * 60
+        with self.__db:
+            self.__db.execute(ROLLUP_MINUTES, (cutoff,))
+            self.__db.execute("DELETE FROM block_stats WHERE ts < ?", (cutoff,))
+            self.__db.execute(
+                "DELETE FROM block_stats_minute WHERE ts < ?",
+                (now - MINUTE_RETENTION,),
+            )
+            self.__db.execute(
+                "DELETE FROM samples WHERE ts < ?", (now - SAMPLE_RETENTION,)
+            )
+
+    async def downsample(self, now=None):
+        await self.__run(self.__downsample, time.time() if now is None else now)
+
+    def __block_stats(self, since, until):
+        return self.__db.execute(
+            "SELECT ts, blocks, txs, sompi FROM block_stats_minute "
+            "WHERE ts >= ? AND ts < ? "
+            "UNION ALL "
+            "SELECT ts, blocks, txs, sompi FROM block_stats "
+            "WHERE ts >= ? AND ts < ? ORDER BY ts",
+            (since, until, since, until),
+        ).fetchall()
+
+    async def block_stats(self, since, until=None):
+        """(ts, blocks, txs, sompi) rows, per minute for old history, else per second."""
+        until = time.time() if until is None else until
+        return await self.__run(self.__block_stats, since, until)
+
+    def __samples(self, name, since, until):
+        return self.__db.execute(
+            "SELECT ts, value FROM samples WHERE name = ? AND ts >= ? AND ts < ? "
+            "ORDER BY ts",
+            (name, since, until),
+        ).fetchall()
+
+    async def samples(self, name, since, until=None):
+        until = time.time() if until is None else until
+        return await self.__run(self.__samples, name, since, until)
+
+    async def __flush_loop(self):
+        last_downsample = None
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if (
+                    last_downsample is None
+                    or time.monotonic() - last_downsample >= RETENTION_INTERVAL
+                ):
+                    await self.downsample()
+                    last_downsample = time.monotonic()
+            except sqlite3.Error as e:
+                _logger.error(f"Error writing metrics: {e}")
+
+    def start(self):
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__flush_loop())
+
+    async def close(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+        if self.__db is not None:
+            try:
+                await self.flush()
+            finally:
+                await self.__run(self.__db.close)
+                self.__db = None
+        self.__executor.shutdown()
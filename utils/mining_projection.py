@@ -0,0 +1,59 @@
+import numpy as np
+
+from utils.emission_schedule import DAA_SCORES_PER_SECOND, SOMPI_PER_SPR, get_schedule
+
+PROJECTION_DAYS = 366  # long enough for the yearly estimate
+DAYS_PER_MONTH = 365.25 / 12
+PERIODS = {  # days
+    "Hour": 1 / 24,
+    "Day": 1,
+    "Week": 7,
+    "Month": DAYS_PER_MONTH,
+    "Year": 365.25,
+}
+
+
+def emitted(daa_scores):
+    """EmissionSchedule.emitted() over a NumPy array of DAA scores."""
+    schedule = get_schedule()
+    breakpoints = np.frombuffer(schedule.breakpoints, dtype=np.int64)
+    rewards = np.frombuffer(schedule.rewards_sompi, dtype=np.int64)
+    # phase i starts where phase i - 1 ended, the first one at DAA score 0
+    starts = np.concatenate(([0], breakpoints[:-1]))
+    bases = np.concatenate(([0], np.frombuffer(schedule.cumulative, dtype=np.int64)))
+    phases = np.searchsorted(breakpoints, daa_scores, side="right")
+    return bases[phases] + (daa_scores - starts[phases]) * rewards[phases]
+
+
+def daily_emission(daa_score, days=PROJECTION_DAYS):
+    """SPR emitted on each of the next `days` days, following the reward schedule."""
+    day = 86400 * DAA_SCORES_PER_SECOND
+    edges = daa_score + np.arange(days + 1, dtype=np.int64) * day
+    return np.diff(emitted(edges)) / SOMPI_PER_SPR
+
+
+def project_rewards(
+    hashrates, net_hashrate, daa_score, monthly_growth=0.0, days=PROJECTION_DAYS
+):
+    """
+    Cumulative SPR mined after each day, one row per hashrate.
+
+    Each day pays the hashrate's share of that day's emission. The network
+    hashrate grows by `monthly_growth` (0.05 for 5%) per month, compounded
+    daily, which shrinks the share over time.
+    """
+    hashrates = np.asarray(hashrates, dtype=np.float64)
+    growth = (1 + monthly_growth) ** (np.arange(days) / DAYS_PER_MONTH)
+    shares = hashrates[:, None] / (net_hashrate * growth)[None, :]
+    return np.cumsum(shares * daily_emission(daa_score, days)[None, :], axis=1)
+
+
+def period_totals(cumulative):
+    """{period: SPR per hashrate} read from project_rewards() at fractional days."""
+    daily = np.diff(cumulative, axis=1, prepend=0)
+    totals = {}
+    for period, days in PERIODS.items():
+        whole = int(days)
+        mined = cumulative[:, whole - 1] if whole else 0
+        totals[period] = mined + (days - whole) * daily[:, whole]
+    return totals
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+
+RENAME_BUDGET = 2  # renames Discord allows per channel and period
+RENAME_PERIOD = 600  # seconds
+
+
+class TokenBucket:
+    """Holds up to `capacity` tokens, refilled evenly over `period` seconds."""
+
+    def __init__(self, capacity=RENAME_BUDGET, period=RENAME_PERIOD):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def __refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now=None) -> bool:
+        self.__refill(time.monotonic() if now is None else now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self, now=None) -> float:
+        """Seconds until a token is available."""
+        self.__refill(time.monotonic() if now is None else now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RenameScheduler:
+    """
+    Renames channels concurrently, within a rename budget per channel.
+
+    Discord limits renames per channel, not globally, so each channel gets
+    its own token bucket. A channel whose budget is spent is deferred until
+    its bucket refills, and only the newest name submitted meanwhile is
+    applied.
+    """
+
+    def __init__(self, get_channel, capacity=RENAME_BUDGET, period=RENAME_PERIOD):
+        self.get_channel = get_channel  # channel id -> channel, or None
+        self.capacity = capacity
+        self.period = period
+        self.applied = {}  # key -> name the channel has
+        self.superseded = 0  # pending names replaced before they were applied
+        self.__pending = {}  # key -> (channel id, name)
+        self.__buckets = {}
+        self.__in_flight = set()
+        self.__wakeup = asyncio.Event()
+
+    @property
+    def pending(self):
+        return {key: name for key, (_, name) in self.__pending.items()}
+
+    def submit(self, key, channel_id, name):
+        """Queues a rename, replacing any pending one. No-op if already applied."""
+        if key in self.__pending:
+            if self.__pending[key][1] == name:
+                return
+            self.superseded += 1
+        elif self.applied.get(key) == name:
+            return
+        logging.info(
+            f"Value change detected for {key}: {self.applied.get(key, 'None')} -> {name}"
+        )
+        self.__pending[key] = (channel_id, name)
+        self.__wakeup.set()
+
+    def __bucket(self, key):
+        if key not in self.__buckets:
+            self.__buckets[key] = TokenBucket(self.capacity, self.period)
+        return self.__buckets[key]
+
+    async def __rename(self, key, channel_id, name):
+        try:
+            channel = self.get_channel(channel_id)
+            if not channel:
+                logging.error(f"Channel {key} ({channel_id}) not found!")
+                return
+            logging.info(f"Updating {key} channel to: {name}")
+            await channel.edit(name=name)
+            self.applied[key] = name
+        except Exception as e:
+            logging.error(f"Error renaming {key} channel: {e}")
+            # retry with the next token, unless a newer name came in meanwhile
+            self.__pending.setdefault(key, (channel_id, name))
+        finally:
+            self.__in_flight.discard(key)
+            self.__wakeup.set()
+
+    def __start_due(self):
+        """Starts every rename whose channel has budget, returns the next wait."""
+        now = time.monotonic()
+        wait = None
+        for key in list(self.__pending):
+            if key in self.__in_flight:
+                continue  # the newest name goes out once this rename is done
+            channel_id, name = self.__pending[key]
+            if name == self.applied.get(key):
+                del self.__pending[key]
+                continue
+            bucket = self.__bucket(key)
+            if not bucket.take(now):
+                delay = bucket.wait_time(now)
+                logging.debug(f"Deferring {key} rename by {delay:.0f}s")
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            del self.__pending[key]
+            self.__in_flight.add(key)
+            asyncio.create_task(self.__rename(key, channel_id, name))
+        return wait
+
+    async def run(self):
+        while True:
+            self.__wakeup.clear()
+            wait = self.__start_due()
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
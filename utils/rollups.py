@@ -0,0 +1,81 @@
+import math
+import time
+from array import array
+
+from utils.sompi_to_spr import sompis_to_spr
+
+# (bucket width in seconds, number of buckets) from finest to coarsest
+DEFAULT_TIERS = (
+    (1, 600),  # per second, last 10 minutes
+    (60, 1440),  # per minute, last 24 hours
+    (3600, 720),  # per hour, last 30 days
+    (86400, 365),  # per day, last year
+)
+
+
+class _Tier:
+    def __init__(self, resolution, size):
+        self.resolution = resolution
+        self.size = size
+        self.span = resolution * size
+        self.keys = array("q", [-1]) * size  # bucket number held by each slot
+        self.blocks = array("Q", [0]) * size
+        self.txs = array("q", [0]) * size  # signed, chain reorgs subtract
+        self.sompi = array("Q", [0]) * size
+
+    def add(self, timestamp, blocks, txs, sompi):
+        key = int(timestamp // self.resolution)
+        slot = key % self.size
+        if self.keys[slot] != key:
+            if self.keys[slot] > key:
+                return  # older than everything this tier still remembers
+            self.keys[slot] = key
+            self.blocks[slot] = self.txs[slot] = self.sompi[slot] = 0
+        self.blocks[slot] += blocks
+        self.txs[slot] += txs
+        self.sompi[slot] += sompi
+
+    def totals(self, window, now):
+        last = int(now // self.resolution)
+        blocks = txs = sompi = 0
+        for key in range(last - math.ceil(window / self.resolution) + 1, last + 1):
+            slot = key % self.size
+            if self.keys[slot] == key:
+                blocks += self.blocks[slot]
+                txs += self.txs[slot]
+                sompi += self.sompi[slot]
+        return blocks, txs, sompi
+
+
+class RollupSeries:
+    """
+    Block, transaction and volume counts in fixed ring buffers of time buckets.
+
+    Every block lands in one bucket per tier, so memory is bounded by the tier
+    sizes no matter the block rate. A window query reads the finest tier that
+    covers it, which costs O(buckets in the window).
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = [_Tier(resolution, size) for resolution, size in tiers]
+
+    def add(self, timestamp, blocks=1, txs=0, sompi=0):
+        """Counts a block at a unix timestamp in seconds."""
+        for tier in self.tiers:
+            tier.add(timestamp, blocks, txs, sompi)
+
+    def totals(self, window, now=None):
+        """(blocks, txs, sompi) over the last `window` seconds."""
+        now = time.time() if now is None else now
+        for tier in self.tiers:
+            if window <= tier.span:
+                return tier.totals(window, now)
+        raise ValueError(f"window of {window}s exceeds the longest tier")
+
+    def rates(self, window, now=None):
+        blocks, txs, sompi = self.totals(window, now)
+        return {
+            "bps": blocks / window,
+            "tps": txs / window,
+            "sprs": sompis_to_spr(sompi, 8) / window,
+        }
@@ -2,21 +2,76 @@ import os
 from dotenv import load_dotenv
 import asyncio
 import logging
-from collections import deque
+import time
+from collections import OrderedDict, deque
 
+from utils.block_decoder import (
+    BlockRecord,
+    decode_block,
+    decode_block_dict,
+    decode_transactions,
+    decode_transactions_dict,
+)
+from utils.block_decode_pool import BlockDecoder
+from utils.block_dedup import LagHistogram, RecentBlockHashes
+from utils.block_store import BlockRecordStore
+from utils.ingestion_queue import IngestionQueue
+from utils.rollups import RollupSeries
 from utils.sompi_to_spr import sompis_to_spr
+from utils.windowed_rate import WindowedRateEstimator
+from spectred.SpectredClient import SpectredClient
 from spectred.SpectredMultiClient import SpectredMultiClient
+from spectred.SpectredThread import SpectredCommunicationError
 
 
 load_dotenv()
 SPECTRED_HOSTS = os.getenv("SPECTRED_HOSTS").split(",")
 
+BPS_WINDOW = int(os.getenv("BPS_WINDOW", 30))  # blocks, e.g. 30 / 300 / 3000
+TPS_WINDOW = int(os.getenv("TPS_WINDOW", 100))  # blocks, 10k+ is cheap
+RATE_WINDOW = int(os.getenv("RATE_WINDOW", 0))  # seconds, 0 keeps the block windows
+RECONNECT_BACKOFF_MIN = 1  # seconds
+RECONNECT_BACKOFF_MAX = 60  # seconds
+BACKFILL_MAX_BLOCKS = 1000  # newest missed blocks replayed after a reconnect
+# "single" follows the best node, "all" subscribes to every host at once,
+# "virtual_chain" follows accepted transaction ids only (TPS, no BPS or SPR/s)
+BLOCK_SUBSCRIPTION_MODE = os.getenv("BLOCK_SUBSCRIPTION_MODE", "single")
+DEDUP_CAPACITY = 10000  # recent block hashes remembered to drop duplicates
+LAG_LOG_INTERVAL = 300  # seconds between ingestion queue and arrival lag reports
+ACCEPTED_TPS_WINDOW = 60  # seconds, unless RATE_WINDOW is set
+
 
 class BlockProcessor:
-    def __init__(self):
-        self.block_times = deque(maxlen=30)
-        self.blocks_cache = deque(maxlen=100)
-        self.sorted_blocks = []
+    def __init__(
+        self,
+        bps_window=BPS_WINDOW,
+        tps_window=TPS_WINDOW,
+        keep_transactions=False,
+        rate_window=RATE_WINDOW,
+        metrics_store=None,
+        decoder=None,
+        on_difficulty=None,
+    ):
+        self.bps_estimator = WindowedRateEstimator(bps_window)
+        self.blocks_cache = BlockRecordStore(tps_window)
+        self.rollups = RollupSeries()
+        self.rate_window = rate_window
+        self.metrics_store = metrics_store
+        self.decoder = decoder if decoder is not None else BlockDecoder()
+        self.on_difficulty = on_difficulty  # called with (difficulty, block time)
+        # new blocks waiting for process_queue
+        self.queue = IngestionQueue(on_drop=self.forget_arrival)
+        self.seen_blocks = RecentBlockHashes(DEDUP_CAPACITY)
+        self.arrivals = RecentBlockHashes(DEDUP_CAPACITY)  # notified, maybe queued
+        self.arrival_lag = {}  # node -> LagHistogram, filled in "all" mode
+        self.chain_accepted = OrderedDict()  # chain block hash -> accepted txs
+        self.accepted_txs = 0
+        self.bytes_received = 0  # serialized size of all handled notifications
+        # per-output detail is only kept for features that ask for it
+        self.transactions = deque(maxlen=tps_window) if keep_transactions else None
+        self.total_txs = 0
+        self.total_sompi = 0
+        self.last_block_hash = None
         self.bps = {
             "latest_block_time": None,
             "avg_block_time": None,
@@ -29,101 +84,365 @@ class BlockProcessor:
 
     def calculate_bps(self, block_timestamp: int) -> None:
         block_timestamp /= 1000
-        self.sorted_blocks.append(block_timestamp)
-
-        # descending order and keep only latest 30 blocks
-        self.sorted_blocks.sort(reverse=True)
-        self.sorted_blocks = self.sorted_blocks[:30]
 
-        if len(self.sorted_blocks) >= 30:
-            # start after we have >= 30 blocks
-            self.block_times = [
-                self.sorted_blocks[i - 1] - self.sorted_blocks[i]
-                for i in range(1, len(self.sorted_blocks))
-            ]
+        # start after the window is full, skip blocks older than all of it
+        if not self.bps_estimator.add(block_timestamp) or not self.bps_estimator.ready:
+            return
 
-            if len(self.block_times) >= 2:
-                avg_block_time = sum(self.block_times) / len(self.block_times)
-                bps_value = 1 / avg_block_time if avg_block_time > 0 else 0
+        avg_block_time = self.bps_estimator.avg_block_time
+        bps_value = self.bps_estimator.bps
 
-                self.bps["latest_block_time"] = self.block_times[-1]
-                self.bps["avg_block_time"] = avg_block_time
-                self.bps["bps"] = bps_value
+        self.bps["latest_block_time"] = self.bps_estimator.oldest_block_time
+        self.bps["avg_block_time"] = avg_block_time
+        self.bps["bps"] = bps_value
 
-                logging.debug(
-                    f"Block Time: {self.block_times[-1]:.2f} sec | "
-                    f"Avg Block Time (Last {len(self.block_times)}): {avg_block_time:.2f} sec | BPS: {bps_value:.2f}"
-                )
+        logging.debug(
+            f"Block Time: {self.bps['latest_block_time']:.2f} sec | "
+            f"Avg Block Time (Last {len(self.bps_estimator) - 1}): {avg_block_time:.2f} sec | BPS: {bps_value:.2f}"
+        )
 
     def calculate_tps_spr_s(self) -> None:
         if len(self.blocks_cache) < 30:
             return
 
-        total_txs = 0
-        total_sprs = 0
-
-        for block in self.blocks_cache:
-            total_txs += block["txCount"]
-
-            for tx in block["txs"]:
-                for _, amount in tx["outputs"]:
-                    total_sprs += int(amount)
-
-        average_tps = round(total_txs / len(self.blocks_cache), 1)
-        average_sprs = round(sompis_to_spr(total_sprs) / len(self.blocks_cache), 1)
+        average_tps = round(self.total_txs / len(self.blocks_cache), 1)
+        average_sprs = round(
+            sompis_to_spr(self.total_sompi) / len(self.blocks_cache), 1
+        )
 
         self.tps_sprs["tps"] = average_tps
         self.tps_sprs["sprs"] = average_sprs
 
         logging.debug(f"TPS: {average_tps} | SPR/s: {average_sprs}")
 
-    def add_block_to_cache(self, block_info) -> None:
-        block_data = {
-            "block_hash": block_info["verboseData"]["hash"],
-            "difficulty": block_info["verboseData"]["difficulty"],
-            "blueScore": block_info["header"]["blueScore"],
-            "timestamp": block_info["header"]["timestamp"],
-            "txCount": len(block_info["transactions"]),
-            "txs": [
-                {
-                    "txId": tx["verboseData"]["transactionId"],
-                    "outputs": [
-                        (
-                            output["verboseData"]["scriptPublicKeyAddress"],
-                            output["amount"],
-                        )
-                        for output in tx["outputs"]
-                    ],
-                }
-                for tx in block_info["transactions"]
-            ],
-        }
+    def update_rates(self, records) -> None:
+        """Updates the figures once for a batch of added records."""
+        records = [r for r in records if r is not None]
+        if not records:
+            return
+        for record in records:
+            self.calculate_bps(float(record.timestamp))
+        self.calculate_tps_spr_s()
+        if self.rate_window:
+            self.calculate_rates()
 
-        self.blocks_cache.append(block_data)
-        logging.debug(f"Added block to cache: {block_data}")
+    def calculate_accepted_tps(self) -> None:
+        window = self.rate_window or ACCEPTED_TPS_WINDOW
+        self.tps_sprs["tps"] = round(self.rates(window)["tps"], 1)
 
+        logging.debug(f"Accepted TPS (Last {window}s): {self.tps_sprs['tps']}")
 
-async def subscribe_block_added(processor: BlockProcessor):
-    spectred_client = SpectredMultiClient(SPECTRED_HOSTS)
-    await spectred_client.initialize_all()
+    def add_virtual_chain_change(self, removed, accepted, arrived=None) -> int:
+        """
+        Counts the transactions accepted by new chain blocks at arrival time.
+
+        Chain blocks removed by a reorg take their count back, their
+        transactions are accepted again by the blocks that replaced them.
+        """
+        txs = 0
+        for block_hash in removed:
+            txs -= self.chain_accepted.pop(block_hash, 0)
+        for accepting in accepted:
+            count = len(accepting.acceptedTransactionIds)
+            self.chain_accepted[accepting.acceptingBlockHash] = count
+            txs += count
+        while len(self.chain_accepted) > DEDUP_CAPACITY:
+            self.chain_accepted.popitem(last=False)
+
+        self.accepted_txs += txs
+        self.rollups.add(time.time() if arrived is None else arrived, 0, txs, 0)
+        return txs
+
+    def rates(self, window: int, now=None) -> dict:
+        """BPS, TPS and SPR/s over the last `window` seconds."""
+        return self.rollups.rates(window, now)
+
+    def calculate_rates(self) -> None:
+        """Replaces the block-window figures with time-window ones."""
+        rates = self.rates(self.rate_window)
+        self.bps["bps"] = rates["bps"]
+        self.tps_sprs["tps"] = round(rates["tps"], 1)
+        self.tps_sprs["sprs"] = round(rates["sprs"], 1)
+
+        logging.debug(
+            f"Last {self.rate_window}s: BPS: {rates['bps']:.2f} | "
+            f"TPS: {rates['tps']:.1f} | SPR/s: {rates['sprs']:.1f}"
+        )
+
+    def forget_arrival(self, block):
+        """Lets another node's copy of a block dropped from the queue through."""
+        self.arrivals.discard(block.verboseData.hash)
+
+    @property
+    def keep_transactions(self):
+        return self.transactions is not None
+
+    def add_block_record(self, record: BlockRecord, transactions=None):
+        """Adds a decoded block, returns None if the block was already added."""
+        if not self.seen_blocks.add(record.block_hash, time.monotonic()):
+            logging.debug("Skipping duplicate block: %s", record.block_hash)
+            return None
+
+        # keep the window totals in step with the cache instead of re-summing it
+        evicted = self.blocks_cache.append(record)
+        if evicted is not None:
+            self.total_txs -= evicted.tx_count
+            self.total_sompi -= evicted.output_sompi
+        self.total_txs += record.tx_count
+        self.total_sompi += record.output_sompi
+        self.rollups.add(
+            record.timestamp / 1000, 1, record.tx_count, record.output_sompi
+        )
+        if self.metrics_store is not None:
+            self.metrics_store.record_block(record)
+        if self.on_difficulty is not None:
+            self.on_difficulty(record.difficulty, record.timestamp / 1000)
+        if self.transactions is not None:
+            self.transactions.append(transactions)
+        self.last_block_hash = record.block_hash
+        logging.debug("Added block to cache: %s", record)
+        return record
+
+    def add_block(self, block):
+        """Adds an RpcBlock protobuf."""
+        if block.verboseData.hash in self.seen_blocks:
+            return None  # skip decoding a block another node already delivered
+        return self.add_block_record(
+            decode_block(block),
+            decode_transactions(block) if self.keep_transactions else None,
+        )
+
+    async def add_blocks(self, blocks):
+        """Adds RpcBlock protobufs through the decoder, None for each duplicate."""
+        blocks = [b for b in blocks if b.verboseData.hash not in self.seen_blocks]
+        decoded = await self.decoder.decode(blocks, self.keep_transactions)
+        return [self.add_block_record(record, txs) for record, txs in decoded]
+
+    def add_block_to_cache(self, block_info):
+        """Adds a block converted with MessageToDict."""
+        return self.add_block_record(
+            decode_block_dict(block_info),
+            decode_transactions_dict(block_info) if self.keep_transactions else None,
+        )
+
+
+async def backfill_blocks(spectred_client, processor, low_hash=None):
+    """Adds the blocks missed since low_hash or the last processed one, oldest first."""
+    if low_hash is None:
+        low_hash = processor.last_block_hash
+    try:
+        # raw keeps the blocks as protobufs so the decoder can take them off the loop
+        resp = await spectred_client.request(
+            "getBlocksRequest",
+            {"lowHash": low_hash, "includeBlocks": True, "includeTransactions": True},
+            raw=True,
+        )
+    except SpectredCommunicationError as e:
+        # the live subscription carries on, only the missed blocks are lost
+        logging.warning(f"Cannot backfill from {low_hash}: {e}")
+        return
+    resp = resp.getBlocksResponse
+    if resp.HasField("error"):
+        logging.warning(f"Cannot backfill from {low_hash}: {resp.error.message}")
+        return
+
+    blocks = [b for b in resp.blocks if b.verboseData.hash != low_hash]
+    if len(blocks) > BACKFILL_MAX_BLOCKS:
+        blocks = blocks[-BACKFILL_MAX_BLOCKS:]
+
+    logging.info(f"Backfilling {len(blocks)} blocks missed since {low_hash}")
+    try:
+        processor.update_rates(await processor.add_blocks(blocks))
+    except Exception as e:
+        logging.error(f"error backfilling blocks: {e}")
+
+
+async def notify_and_backfill(spectred_client, processor, command, params, handler):
+    """
+    Subscribes, and backfills once the node has confirmed the subscription.
+
+    Backfilling first would lose the blocks added before the subscription
+    is up. This way they arrive on both paths, and the copies are dropped
+    by hash.
+    """
+    low_hash = processor.last_block_hash
+    subscribed = asyncio.Event()
+
+    async def on_event(event):
+        subscribed.set()
+        await handler(event)
+
+    notify = asyncio.create_task(
+        spectred_client.notify(command, params, on_event, raw=True)
+    )
+    try:
+        if low_hash is not None:
+            confirmed = asyncio.create_task(subscribed.wait())
+            await asyncio.wait({notify, confirmed}, return_when=asyncio.FIRST_COMPLETED)
+            confirmed.cancel()
+            if subscribed.is_set():
+                await backfill_blocks(spectred_client, processor, low_hash)
+        await notify
+    finally:
+        notify.cancel()
+
+
+def block_added_handler(processor: BlockProcessor, on_arrival=None, lag=None):
+    """notifyBlockAddedRequest callback queueing new blocks for the processor."""
 
     async def on_new_block(event):
         try:
-            if "blockAddedNotification" not in event:
+            if event.WhichOneof("payload") != "blockAddedNotification":
                 logging.debug(f"Ignoring non-block event: {event}")
                 return
 
-            block_info = event["blockAddedNotification"]["block"]
-            processor.add_block_to_cache(block_info)
-            timestamp = block_info["header"]["timestamp"]
-            processor.calculate_bps(float(timestamp))
-            processor.calculate_tps_spr_s()
+            processor.bytes_received += event.ByteSize()
+            block = event.blockAddedNotification.block
+            block_hash = block.verboseData.hash
+            now = time.monotonic()
+            first_seen = processor.arrivals.first_seen(block_hash)
+            if lag is not None:
+                lag.add(0 if first_seen is None else now - first_seen)
+            if on_arrival is not None:
+                on_arrival()
+            if first_seen is not None:
+                return  # another node delivered it first
+
+            processor.arrivals.add(block_hash, now)
+            await processor.queue.put(block)
+        except Exception as e:
+            logging.error(f"error queueing block: {e}")
+
+    return on_new_block
+
+
+def virtual_chain_handler(processor: BlockProcessor, on_arrival=None):
+    """notifyVirtualChainChangedRequest callback counting accepted transactions."""
+
+    async def on_chain_changed(event):
+        try:
+            if event.WhichOneof("payload") != "virtualChainChangedNotification":
+                logging.debug(f"Ignoring non-chain event: {event}")
+                return
+
+            processor.bytes_received += event.ByteSize()
+            if on_arrival is not None:
+                on_arrival()
+            change = event.virtualChainChangedNotification
+            processor.add_virtual_chain_change(
+                change.removedChainBlockHashes, change.acceptedTransactionIds
+            )
+            processor.calculate_accepted_tps()
+        except Exception as e:
+            logging.error(f"error processing chain change: {e}")
 
-            logging.debug(f"New Block! {block_info['verboseData']['hash']}")
+    return on_chain_changed
+
+
+async def process_queue(processor: BlockProcessor):
+    """Adds queued blocks to the processor in micro-batches."""
+    while True:
+        blocks = await processor.queue.get_batch()
+        try:
+            records = await processor.add_blocks(blocks)
+            processor.update_rates(records)
+            logging.debug(f"Processed {len(records)} new blocks")
         except Exception as e:
-            logging.error(f"error processing block: {e}")
+            logging.error(f"error processing blocks: {e}")
+
+
+async def log_ingestion(processor: BlockProcessor, interval=LAG_LOG_INTERVAL):
+    bytes_received, cpu = processor.bytes_received, time.process_time()
+    while True:
+        await asyncio.sleep(interval)
+        logging.info(
+            f"Block ingestion ({BLOCK_SUBSCRIPTION_MODE}): "
+            f"{(processor.bytes_received - bytes_received) / interval / 1024:.1f} KiB/s, "
+            f"process CPU {(time.process_time() - cpu) / interval:.1%}, "
+            f"queue {processor.queue}"
+        )
+        bytes_received, cpu = processor.bytes_received, time.process_time()
+        for node, lag in processor.arrival_lag.items():
+            logging.info(f"Block arrival lag from {node}: {lag}")
+
+
+async def subscribe_block_added(processor: BlockProcessor):
+    if BLOCK_SUBSCRIPTION_MODE == "all":
+        subscribe = subscribe_block_added_all(processor)
+    else:
+        subscribe = subscribe_block_added_single(
+            processor, virtual_chain=BLOCK_SUBSCRIPTION_MODE == "virtual_chain"
+        )
+    await asyncio.gather(process_queue(processor), log_ingestion(processor), subscribe)
+
+
+async def subscribe_block_added_single(processor: BlockProcessor, virtual_chain=False):
+    spectred_client = SpectredMultiClient(SPECTRED_HOSTS)
+    await spectred_client.initialize_any()
+    spectred_client.start_health_probe()
+
+    backoff = RECONNECT_BACKOFF_MIN
+
+    def reset_backoff():
+        nonlocal backoff
+        backoff = RECONNECT_BACKOFF_MIN
+
+    if virtual_chain:
+        command = "notifyVirtualChainChangedRequest"
+        params = {"includeAcceptedTransactionIds": True}
+        handler = virtual_chain_handler(processor, reset_backoff)
+    else:
+        command, params = "notifyBlockAddedRequest", None
+        handler = block_added_handler(processor, reset_backoff)
+
+    while True:
+        try:
+            await notify_and_backfill(
+                spectred_client, processor, command, params, handler
+            )
+            logging.warning("Block subscription ended by node.")
+        except SpectredCommunicationError as e:
+            logging.warning(f"Block subscription lost: {e}")
+
+        # the failed node's error rate rises, so the next attempt prefers another one
+        logging.info(f"Resubscribing to blocks in {backoff}s...")
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+        await spectred_client.initialize_all()
+
+
+async def subscribe_node(spectred: SpectredClient, processor: BlockProcessor):
+    """Keeps one node's block stream open, feeding the shared processor."""
+    lag = processor.arrival_lag.setdefault(str(spectred), LagHistogram())
+    backoff = RECONNECT_BACKOFF_MIN
+
+    def reset_backoff():
+        nonlocal backoff
+        backoff = RECONNECT_BACKOFF_MIN
+
+    on_new_block = block_added_handler(processor, reset_backoff, lag)
+
+    while True:
+        try:
+            await spectred.ping()
+            if not spectred.is_synced:
+                raise SpectredCommunicationError(f"{spectred} is not synced")
+            # duplicates of blocks other nodes delivered are dropped by hash
+            await notify_and_backfill(
+                spectred, processor, "notifyBlockAddedRequest", None, on_new_block
+            )
+            logging.warning(f"Block subscription to {spectred} ended by node.")
+        except SpectredCommunicationError as e:
+            logging.warning(f"Block subscription to {spectred} lost: {e}")
+
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
 
-    await spectred_client.notify("notifyBlockAddedRequest", None, on_new_block)
+async def subscribe_block_added_all(processor: BlockProcessor):
+    """Subscribes to every host at once, the first copy of each block wins."""
+    spectreds = [SpectredClient(*h.split(":")) for h in SPECTRED_HOSTS]
+    await asyncio.gather(*(subscribe_node(k, processor) for k in spectreds))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+import heapq
+
+
+class WindowedRateEstimator:
+    """
+    Block rate over the newest `window` block timestamps.
+
+    DAG blocks do not arrive in timestamp order, so the window is a min-heap
+    of the newest timestamps seen: older ones are rejected, newer ones
+    replace the current oldest in O(log n). The gaps between consecutive
+    timestamps sum to newest - oldest, so the average block time needs no
+    rescan of the window.
+    """
+
+    def __init__(self, window=30):
+        if window < 3:
+            raise ValueError("window must hold at least 3 timestamps")
+        self.window = window
+        self.__heap = []
+        self.__newest = None
+
+    def __len__(self):
+        return len(self.__heap)
+
+    @property
+    def ready(self):
+        return len(self.__heap) == self.window
+
+    def add(self, timestamp) -> bool:
+        """Adds a timestamp, returns False if it is older than the whole window."""
+        if len(self.__heap) < self.window:
+            heapq.heappush(self.__heap, timestamp)
+        elif timestamp > self.__heap[0]:
+            heapq.heapreplace(self.__heap, timestamp)
+        else:
+            return False
+
+        if self.__newest is None or timestamp > self.__newest:
+            self.__newest = timestamp
+        return True
+
+    @property
+    def avg_block_time(self):
+        if len(self.__heap) < 2:
+            return None
+        return (self.__newest - self.__heap[0]) / (len(self.__heap) - 1)
+
+    @property
+    def oldest_block_time(self):
+        """Gap between the two oldest timestamps in the window."""
+        if len(self.__heap) < 2:
+            return None
+        return min(self.__heap[1:3]) - self.__heap[0]
+
+    @property
+    def bps(self):
+        avg_block_time = self.avg_block_time
+        if avg_block_time is None:
+            return None
+        return 1 / avg_block_time if avg_block_time > 0 else 0